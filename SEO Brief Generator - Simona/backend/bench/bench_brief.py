@@ -0,0 +1,283 @@
+"""
+Offline benchmark for the content brief pipeline.
+
+Runs run_content_brief and its stages against recorded fixtures — saved
+competitor pages of varied sizes, a Serper payload and a canned Claude
+response — so nothing touches Serper, live sites or Anthropic.
+
+Reports per-stage timings (parse, prompt build, markdown render, HTML
+format), peak memory and end-to-end jobs/sec, and writes them as JSON so
+runs can be compared against a baseline:
+
+    cd backend
+    python bench/bench_brief.py --output bench/results/base.json
+    python bench/bench_brief.py --baseline bench/results/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+# Caches would turn every run after the first into a cache benchmark.
+os.environ.setdefault("PAGE_CACHE_MAX_MB", "0")
+os.environ.setdefault("SERP_CACHE_TTL", "0")
+os.environ.setdefault("SERP_CACHE_DIR", tempfile.mkdtemp(prefix="bench-serp-"))
+os.environ.setdefault("LLM_CACHE_TTL", "0")
+os.environ.setdefault("LLM_CACHE_DIR", tempfile.mkdtemp(prefix="bench-llm-"))
+os.environ.setdefault("SERPER_API_KEY", "bench")
+# Likewise the rate limiters would measure RATE_* rather than the pipeline.
+for _upstream in ("SERPER", "ANTHROPIC", "CREW", "DOMAIN"):
+    os.environ.setdefault(f"RATE_{_upstream}_RPS", "0")
+    os.environ.setdefault(f"RATE_{_upstream}_CONCURRENCY", "0")
+
+import httpx  # noqa: E402
+
+import brief_worker  # noqa: E402
+import http_clients  # noqa: E402
+from html_extract import extract_page_bytes, shutdown_extract_pool, start_extract_pool  # noqa: E402
+from job_store import JobStore  # noqa: E402
+
+KEYWORD = "best megaways slots"
+MAX_CONTENT = brief_worker.PAGE_CONTENT_CHARS
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+def load_fixtures() -> tuple[dict, dict[str, bytes], str]:
+    with open(os.path.join(FIXTURES, "serper.json"), encoding="utf-8") as f:
+        serper = json.load(f)
+    pages_dir = os.path.join(FIXTURES, "pages")
+    names = sorted(os.listdir(pages_dir))
+    pages = {}
+    for result, name in zip(serper["organic"], names):
+        with open(os.path.join(pages_dir, name), "rb") as f:
+            pages[result["link"]] = f.read()
+    with open(os.path.join(FIXTURES, "claude_response.md"), encoding="utf-8") as f:
+        claude_text = f.read()
+    return serper, pages, claude_text
+
+
+class _FakeStream:
+    """Stands in for anthropic's MessageStream with a canned response."""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    @property
+    def text_stream(self):
+        for i in range(0, len(self._text), 16):
+            yield self._text[i:i + 16]
+
+    def get_final_message(self):
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=self._text)],
+            usage=SimpleNamespace(
+                input_tokens=0,
+                output_tokens=0,
+                cache_creation_input_tokens=0,
+                cache_read_input_tokens=0,
+            ),
+        )
+
+
+def install_fakes(serper: dict, pages: dict[str, bytes], claude_text: str) -> None:
+    """Points the shared clients at in-process fixtures."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if str(request.url) == brief_worker.SERPER_URL:
+            return httpx.Response(200, json=serper)
+        body = pages.get(str(request.url))
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(
+            200, content=body, headers={"Content-Type": "text/html; charset=utf-8"}
+        )
+
+    http_clients._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    http_clients._anthropic_client = SimpleNamespace(
+        messages=SimpleNamespace(stream=lambda **kwargs: _FakeStream(claude_text))
+    )
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(ms[len(ms) // 2], 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "min_ms": round(ms[0], 4),
+        "n": len(ms),
+    }
+
+
+def time_stage(fn, iterations: int) -> dict[str, float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+
+
+def bench_stages(pages: dict[str, bytes], claude_text: str, iterations: int) -> dict:
+    stages = {}
+    competitor_data = []
+    for i, (url, body) in enumerate(pages.items(), 1):
+        stages[f"parse[{i}:{len(body) // 1024}KB]"] = time_stage(
+            lambda body=body: extract_page_bytes(body, "utf-8", MAX_CONTENT), iterations
+        )
+        title, content = extract_page_bytes(body, "utf-8", MAX_CONTENT)
+        competitor_data.append(
+            {"position": i, "url": url, "title": title or url, "content": content}
+        )
+
+    stages["parse_all"] = time_stage(
+        lambda: [extract_page_bytes(body, "utf-8", MAX_CONTENT) for body in pages.values()],
+        iterations,
+    )
+    stages["prompt_build"] = time_stage(
+        lambda: brief_worker._build_prompt(KEYWORD, competitor_data), iterations
+    )
+    stages["markdown_render"] = time_stage(
+        lambda: brief_worker._render_markdown(claude_text), iterations
+    )
+    stages["html_format"] = time_stage(
+        lambda: brief_worker._format_report(KEYWORD, claude_text, competitor_data), iterations
+    )
+    return stages
+
+
+def _run_job(store: JobStore, n: int) -> float:
+    job_id = f"bench-{n}"
+    store.create(job_id, "brief", {"keyword": KEYWORD, "competitor_urls": []})
+    t0 = time.perf_counter()
+    brief_worker.run_content_brief(store, job_id, KEYWORD)
+    elapsed = time.perf_counter() - t0
+    if store.get(job_id)["status"] != "complete":
+        raise RuntimeError(f"{job_id} failed: {store.get(job_id)['error']}")
+    return elapsed
+
+
+def bench_end_to_end(jobs: int, concurrency: int) -> dict:
+    store = JobStore()
+    _run_job(store, -1)  # warm-up
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda n: _run_job(store, n), range(jobs)))
+    wall = time.perf_counter() - t0
+    return {
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 4),
+        "jobs_per_sec": round(jobs / wall, 2),
+        "latency": summarize(latencies),
+    }
+
+
+def bench_memory() -> dict:
+    store = JobStore()
+    tracemalloc.start()
+    _run_job(store, -2)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "job_peak_traced_bytes": peak,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "process_max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        * (1 if sys.platform == "darwin" else 1024),
+    }
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+def compare(result: dict, baseline: dict) -> None:
+    print("\nvs baseline:")
+    for name, stats in result["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base:
+            delta = (stats["mean_ms"] - base["mean_ms"]) / base["mean_ms"] * 100
+            print(f"  {name:<22} {base['mean_ms']:>10.3f} → {stats['mean_ms']:>10.3f} ms  ({delta:+.1f}%)")
+    base_e2e = baseline.get("end_to_end")
+    if base_e2e:
+        now, was = result["end_to_end"]["jobs_per_sec"], base_e2e["jobs_per_sec"]
+        print(f"  {'jobs/sec':<22} {was:>10.2f} → {now:>10.2f}     ({(now - was) / was * 100:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=30, help="samples per stage")
+    parser.add_argument("--jobs", type=int, default=40, help="end-to-end jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent end-to-end jobs")
+    parser.add_argument("--extract-processes", type=int, default=0,
+                        help="run extraction in a process pool of this size (0 = inline)")
+    parser.add_argument("--output", help="write results JSON here (default: bench/results/)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    args = parser.parse_args()
+
+    serper, pages, claude_text = load_fixtures()
+    install_fakes(serper, pages, claude_text)
+    if args.extract_processes:
+        os.environ["EXTRACT_PROCESSES"] = str(args.extract_processes)
+        start_extract_pool()
+
+    try:
+        result = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "args": vars(args),
+            },
+            "stages": bench_stages(pages, claude_text, args.iterations),
+            "end_to_end": bench_end_to_end(args.jobs, args.concurrency),
+            "memory": bench_memory(),
+        }
+    finally:
+        shutdown_extract_pool()
+
+    for name, stats in result["stages"].items():
+        print(f"{name:<22} mean {stats['mean_ms']:>10.3f} ms   p95 {stats['p95_ms']:>10.3f} ms")
+    e2e = result["end_to_end"]
+    print(f"end-to-end             {e2e['jobs_per_sec']} jobs/sec "
+          f"(p50 {e2e['latency']['p50_ms']:.1f} ms, p95 {e2e['latency']['p95_ms']:.1f} ms)")
+    print(f"peak memory            {result['memory']['job_peak_traced_bytes'] / 1e6:.1f} MB traced per job, "
+          f"{result['memory']['process_max_rss_bytes'] / 1e6:.1f} MB max RSS")
+
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
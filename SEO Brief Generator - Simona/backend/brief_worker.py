@@ -1,181 +1,745 @@
 """
 SEO Content Brief worker — replicates the N8N workflow:
-  keyword → Serper search → fetch top 5 pages → BeautifulSoup extract
+  keyword → Serper search → fetch top 5 pages → lxml extract
            → Claude analysis → formatted HTML report
 """
 import html as html_lib
 import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any
-
-import httpx
-from bs4 import BeautifulSoup
-
+from typing import Callable
+from urllib.parse import urlsplit
+
+from context_pack import estimate_tokens, pack_contents
+from html_extract import extract_html
+from http_clients import get_anthropic_client, get_http_client
+from job_store import JobStore
+from metrics import (
+    JOBS_FINISHED, LLM_TOKENS, RATE_LIMIT_WAIT, record_stage, stage_timer, upstream_error,
+)
+from page_cache import build_page_cache
+from pipeline import Pipeline, Stage
+from rate_limit import Limiter, Throttled, domain_limiter, limiter, retry_after
+from url_fetch import SingleFlight, UrlFetchCoordinator
+from ttl_cache import TTLCache, cache_key
+
+
+# ── Fetch settings ─────────────────────────────────────────────────────────────
+# Per-page timeout (seconds) and the deadline for each competitor page of a
+# brief, counted from when it reaches the fetch pool (all at once unless a
+# domain limiter holds some back). Pages still outstanding are skipped.
+PAGE_TIMEOUT = float(os.getenv("PAGE_TIMEOUT", "15"))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "40"))
+# Longest a page may be held back by its domain's rate limiter before it is
+# skipped. Not counted against FETCH_DEADLINE.
+DOMAIN_WAIT_LIMIT = float(os.getenv("RATE_DOMAIN_MAX_WAIT", "60"))
+
+# Pages are streamed and cut off at this many bytes; at most
+# PAGE_CONTENT_CHARS of extracted text per page goes on to the context packer.
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", "1000000"))
+PAGE_CONTENT_CHARS = int(os.getenv("PAGE_CONTENT_CHARS", "24000"))
+
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+}
+
+# ── Serper settings ────────────────────────────────────────────────────────────
+# SERPER_BASE_URL can point at a stub server (see loadtest/stub_server.py).
+SERPER_URL = os.getenv("SERPER_BASE_URL", "https://google.serper.dev").rstrip("/") + "/search"
+
+# SERP results keyed by normalized keyword + search params (memory + disk tiers).
+_serp_cache = TTLCache(
+    "serp",
+    ttl=float(os.getenv("SERP_CACHE_TTL", "21600")),
+    max_entries=int(os.getenv("SERP_CACHE_ENTRIES", "2048")),
+    directory=os.getenv(
+        "SERP_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache", "serp")
+    ),
+    max_disk_entries=int(os.getenv("SERP_CACHE_DISK_ENTRIES", "20000")),
+)
+
+# On-disk cache of fetched pages (PAGE_CACHE_*); None when disabled.
+_page_cache = build_page_cache()
+
+# One in-flight load per URL across all jobs; failed URLs fail fast for
+# PAGE_FAILURE_TTL seconds instead of costing every brief a full timeout.
+_url_fetches = UrlFetchCoordinator(
+    failure_ttl=float(os.getenv("PAGE_FAILURE_TTL", "120")), transient=(Throttled,)
+)
+
+# Shared across jobs so concurrent briefs can't multiply fetch threads.
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FETCH_WORKERS", "16")),
+    thread_name_prefix="page-fetch",
+)
+
+
+# ── Claude settings ────────────────────────────────────────────────────────────
+BRIEF_MODEL = "claude-sonnet-4-6"
+
+# Mark the static instructions with cache_control so Anthropic serves them
+# from its prompt cache. Prefixes below the model's minimum cacheable length
+# (1024 tokens for Sonnet) are silently sent uncached — which the current
+# instructions are (see BRIEF_INSTRUCTIONS).
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "1") == "1"
+
+# Estimated tokens of competitor text per brief, shared across the pages that
+# extracted successfully (see context_pack.py).
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+
+# Output budget: room for the six sections plus some per competitor page
+# discussed, capped at BRIEF_MAX_TOKENS.
+BRIEF_BASE_TOKENS = int(os.getenv("BRIEF_BASE_TOKENS", "2048"))
+BRIEF_TOKENS_PER_PAGE = int(os.getenv("BRIEF_TOKENS_PER_PAGE", "384"))
+BRIEF_MAX_TOKENS = int(os.getenv("BRIEF_MAX_TOKENS", "4096"))
+
+# Finished Claude responses keyed by a hash of the exact request (model,
+# parameters, system and messages): an identical prompt replays the stored
+# brief instead of paying for a new call. force_refresh bypasses the lookup.
+_llm_cache = TTLCache(
+    "llm",
+    ttl=float(os.getenv("LLM_CACHE_TTL", "604800")),
+    max_entries=int(os.getenv("LLM_CACHE_ENTRIES", "256")),
+    directory=os.getenv(
+        "LLM_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache", "llm")
+    ),
+    max_disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", "4000")),
+)
 
 # ── Progress helper ────────────────────────────────────────────────────────────
 
-def _push(job_store: dict, job_id: str, msg: str) -> None:
-    if job_id in job_store:
-        job_store[job_id]["progress"].append(msg)
+def _push(job_store: JobStore, job_id: str, msg: str) -> None:
+    job_store.push_progress(job_id, msg)
 
 
 # ── Main worker (runs in a thread) ─────────────────────────────────────────────
 
+class BriefRun:
+    """One brief's inputs and intermediate results as it moves through the stages."""
+
+    def __init__(
+        self,
+        job_store: JobStore,
+        job_id: str,
+        keyword: str,
+        competitor_urls: list[str] | None = None,
+        force_refresh: bool = False,
+        fetch_memo: SingleFlight | None = None,
+    ) -> None:
+        self.job_store = job_store
+        self.job_id = job_id
+        self.keyword = keyword
+        self.competitor_urls = competitor_urls
+        self.force_refresh = force_refresh
+        self.fetch_memo = fetch_memo
+        self.organic: list[dict] = []
+        self.competitor_data: list[dict] = []
+        self.brief_text = ""
+
+
+def search_stage(run: BriefRun) -> None:
+    job_store, job_id = run.job_store, run.job_id
+    job_store.update(job_id, status="running")
+    _push(job_store, job_id, f"Starting content brief for: {run.keyword}")
+
+    # ── Step 1: Resolve competitor URLs ───────────────────────────────────────
+    # Use manually provided URLs if given, otherwise search via Serper.
+    if run.competitor_urls:
+        _push(job_store, job_id, f"Using {len(run.competitor_urls)} manually provided competitor URLs...")
+        run.organic = [{"link": url, "title": url} for url in run.competitor_urls[:5]]
+    else:
+        serper_key = os.getenv("SERPER_API_KEY", "")
+        if not serper_key:
+            raise ValueError("SERPER_API_KEY is not set in environment")
+
+        with stage_timer(job_store, job_id, "brief", "search"):
+            search_data = _search_serper(job_store, job_id, serper_key, run.keyword)
+        run.organic = search_data.get("organic", [])[:5]
+        if not run.organic:
+            raise ValueError("No organic search results returned by Serper")
+
+
+def fetch_stage(run: BriefRun) -> None:
+    job_store, job_id = run.job_store, run.job_id
+    _push(job_store, job_id, f"Found {len(run.organic)} pages — fetching competitor content...")
+
+    # ── Step 2: Fetch + extract pages concurrently ────────────────────────────
+    run.competitor_data = _fetch_competitors(job_store, job_id, run.organic, run.fetch_memo)
+
+
+def llm_stage(run: BriefRun) -> None:
+    job_store, job_id = run.job_store, run.job_id
+
+    # ── Step 3: Build AI prompt ────────────────────────────────────────────────
+    _push(job_store, job_id, "Building competitor analysis prompt...")
+
+    with stage_timer(job_store, job_id, "brief", "prompt"):
+        prompt = _build_prompt(run.keyword, run.competitor_data)
+    pages = sum(1 for item in run.competitor_data if item["content"])
+    max_tokens = _max_tokens_for(pages)
+    _push(
+        job_store, job_id,
+        f"Packed {pages} pages into ~{estimate_tokens(prompt)} prompt tokens "
+        f"(max {max_tokens} output tokens)",
+    )
+
+    # ── Step 4: Claude analysis ────────────────────────────────────────────────
+    _push(job_store, job_id, "Sending to Claude for content brief analysis...")
+    with stage_timer(job_store, job_id, "brief", "llm"):
+        run.brief_text = _generate_brief(
+            job_store, job_id, prompt, max_tokens, run.force_refresh
+        )
+    _push(job_store, job_id, "Claude analysis complete — formatting report...")
+
+
+def render_stage(run: BriefRun) -> None:
+    job_store, job_id = run.job_store, run.job_id
+
+    # ── Step 5: Format HTML report ─────────────────────────────────────────────
+    with stage_timer(job_store, job_id, "brief", "render"):
+        report_html = _format_report(run.keyword, run.brief_text, run.competitor_data)
+
+    # Last progress line before the status: SSE numbers the terminal event after it.
+    _push(job_store, job_id, "Content brief ready!")
+    job_store.update(job_id, report_html=report_html, status="complete")
+    JOBS_FINISHED.inc("brief", "complete")
+
+
+# In order; run_content_brief() runs them back to back, the batch pipeline
+# (pipeline.py) gives each its own worker pool.
+BRIEF_STAGES = (
+    ("search", search_stage),
+    ("fetch", fetch_stage),
+    ("llm", llm_stage),
+    ("render", render_stage),
+)
+
+
+def build_batch_pipeline(on_finished: Callable[[BriefRun], None]) -> Pipeline:
+    """Pipeline running BRIEF_STAGES, one worker pool per stage.
+
+    Pool sizes come from PIPELINE_<STAGE>_WORKERS and the queues between
+    stages hold PIPELINE_QUEUE_SIZE briefs. on_finished(run) is called once
+    a brief completes or fails.
+    """
+    defaults = {"search": 2, "fetch": 4, "llm": 4, "render": 1}
+    stages = [
+        Stage(name, fn, int(os.getenv(f"PIPELINE_{name.upper()}_WORKERS", str(defaults[name]))))
+        for name, fn in BRIEF_STAGES
+    ]
+
+    def on_error(run: BriefRun, exc: Exception) -> None:
+        fail_brief(run, exc)
+        on_finished(run)
+
+    return Pipeline(
+        "brief-batch", stages,
+        queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "4")),
+        on_done=on_finished,
+        on_error=on_error,
+    )
+
+
+def fail_brief(run: BriefRun, exc: Exception) -> None:
+    import traceback
+    print(f"[brief error] {''.join(traceback.format_exception(exc))}", flush=True)
+    _push(run.job_store, run.job_id, f"ERROR: {exc}")
+    run.job_store.update(run.job_id, status="error", error=str(exc))
+    JOBS_FINISHED.inc("brief", "error")
+
+
 def run_content_brief(
-    job_store: dict[str, Any],
+    job_store: JobStore,
     job_id: str,
     keyword: str,
     competitor_urls: list[str] | None = None,
+    force_refresh: bool = False,
+    fetch_memo: SingleFlight | None = None,
 ) -> None:
+    run = BriefRun(job_store, job_id, keyword, competitor_urls, force_refresh, fetch_memo)
     try:
-        job_store[job_id]["status"] = "running"
-        _push(job_store, job_id, f"Starting content brief for: {keyword}")
-
-        # ── Step 1: Resolve competitor URLs ───────────────────────────────────
-        # Use manually provided URLs if given, otherwise search via Serper.
-        if competitor_urls:
-            _push(job_store, job_id, f"Using {len(competitor_urls)} manually provided competitor URLs...")
-            organic = [{"link": url, "title": url} for url in competitor_urls[:5]]
-        else:
-            serper_key = os.getenv("SERPER_API_KEY", "")
-            if not serper_key:
-                raise ValueError("SERPER_API_KEY is not set in environment")
-
-            _push(job_store, job_id, "Searching Google via Serper API...")
-            with httpx.Client(timeout=30) as client:
-                resp = client.post(
-                    "https://google.serper.dev/search",
+        for _, stage in BRIEF_STAGES:
+            stage(run)
+    except Exception as exc:
+        fail_brief(run, exc)
+
+
+# ── Rate limits ────────────────────────────────────────────────────────────────
+
+# Limiter waits at least this long are reported in the job's progress.
+RATE_WAIT_REPORT_SECONDS = float(os.getenv("RATE_WAIT_REPORT_SECONDS", "0.5"))
+# Extra attempts after a 429/503 that carried Retry-After.
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+
+
+@contextmanager
+def _rate_limited(
+    job_store: JobStore | None, job_id: str | None, upstream: Limiter, label: str,
+    block: bool = True,
+):
+    """Runs the block under the `upstream` limiter, recording the wait in the job as wait[label].
+
+    With block=False a busy limiter raises Throttled instead of waiting. A
+    Retry-After error raised by the block pauses the limiter before propagating.
+    """
+    with upstream.slot(block) as waited:
+        if job_store and waited > 0.001:
+            job_store.record_timing(job_id, f"wait[{label}]", waited)
+            if waited >= RATE_WAIT_REPORT_SECONDS:
+                _push(job_store, job_id, f"Waited {waited:.1f}s for the {label} rate limit...")
+        try:
+            yield
+        except Exception as exc:
+            upstream.backoff(exc)
+            raise
+
+
+# ── Serper search ──────────────────────────────────────────────────────────────
+
+def normalize_keyword(keyword: str) -> str:
+    """Case- and whitespace-insensitive form of a keyword, used for cache keys."""
+    return " ".join(keyword.lower().split())
+
+
+def _search_serper(job_store: JobStore, job_id: str, serper_key: str, keyword: str) -> dict:
+    """Runs a Serper search, served from the SERP cache when possible."""
+    params = {"q": normalize_keyword(keyword)}
+    key = cache_key(SERPER_URL, params)
+    cached = _serp_cache.get(key)
+    if cached is not None:
+        _push(job_store, job_id, "Using cached Serper results...")
+        return cached
+
+    _push(job_store, job_id, "Searching Google via Serper API...")
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            with _rate_limited(job_store, job_id, limiter("serper"), "serper"):
+                resp = get_http_client().post(
+                    SERPER_URL,
                     headers={"X-API-KEY": serper_key, "Content-Type": "application/json"},
-                    json={"q": keyword},
+                    json=params,
+                    timeout=30,
                 )
                 resp.raise_for_status()
                 search_data = resp.json()
-
-            organic = search_data.get("organic", [])[:5]
-            if not organic:
-                raise ValueError("No organic search results returned by Serper")
-
-        _push(job_store, job_id, f"Found {len(organic)} pages — fetching competitor content...")
-
-        # ── Step 2: Fetch + extract each page ─────────────────────────────────
-        competitor_data = []
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
-        }
-
-        for i, result in enumerate(organic, 1):
-            url = result.get("link", "")
-            fallback_title = result.get("title", f"Page {i}")
-            _push(job_store, job_id, f"[{i}/{len(organic)}] Fetching {url[:70]}...")
-
-            try:
-                with httpx.Client(timeout=30, follow_redirects=True) as client:
-                    page_resp = client.get(url, headers=headers)
-                    page_resp.raise_for_status()
-                    raw_html = page_resp.text
-
-                soup = BeautifulSoup(raw_html, "lxml")
-
-                # Remove noise
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
-
-                # Main content selector (mirrors N8N HTML node)
-                content_el = (
-                    soup.find("article")
-                    or soup.find(class_="post-content")
-                    or soup.find(class_="entry-content")
-                    or soup.find("main")
-                    or soup.find("body")
-                )
-                content_text = (
-                    content_el.get_text(separator=" ", strip=True)[:800]
-                    if content_el else ""
+            break
+        except Exception as exc:
+            upstream_error("serper", exc)
+            if attempt == RATE_LIMIT_RETRIES or retry_after(exc) is None:
+                raise
+    if search_data.get("organic"):
+        _serp_cache.set(key, search_data)
+    return search_data
+
+
+# Serper accepts up to 100 queries per request as a JSON array.
+SERPER_BATCH_SIZE = 100
+
+
+def prefetch_serp(serper_key: str, keywords: list[str]) -> int:
+    """Warms the SERP cache for many keywords with batched Serper calls.
+
+    Keywords already cached are skipped. Failures are swallowed — each
+    brief then searches on its own. Returns how many results were cached.
+    """
+    todo = {}
+    for keyword in keywords:
+        params = {"q": normalize_keyword(keyword)}
+        key = cache_key(SERPER_URL, params)
+        if key not in todo and _serp_cache.get(key) is None:
+            todo[key] = params
+    items = list(todo.items())
+    chunks = [items[n:n + SERPER_BATCH_SIZE] for n in range(0, len(items), SERPER_BATCH_SIZE)]
+
+    def fetch_chunk(chunk: list[tuple[str, dict]]) -> int:
+        try:
+            with _rate_limited(None, None, limiter("serper"), "serper"):
+                resp = get_http_client().post(
+                    SERPER_URL,
+                    headers={"X-API-KEY": serper_key, "Content-Type": "application/json"},
+                    json=[params for _, params in chunk],
+                    timeout=60,
                 )
+                resp.raise_for_status()
+                results = resp.json()
+        except Exception as exc:
+            upstream_error("serper", exc)
+            return 0
+        if not isinstance(results, list) or len(results) != len(chunk):
+            return 0
+        stored = 0
+        for (key, _), search_data in zip(chunk, results):
+            if isinstance(search_data, dict) and search_data.get("organic"):
+                _serp_cache.set(key, search_data)
+                stored += 1
+        return stored
+
+    return sum(_fetch_pool.map(fetch_chunk, chunks))
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Hit/miss counters for the worker's caches."""
+    return {
+        "serp": _serp_cache.stats(),
+        "llm": _llm_cache.stats(),
+        "page_failures": _url_fetches.stats(),
+    }
+
+
+# ── Streaming Claude output ────────────────────────────────────────────────────
+
+# Deltas are batched so a 4k-token response becomes tens of SSE events, not thousands.
+DELTA_FLUSH_CHARS = 200
+DELTA_FLUSH_SECONDS = 0.25
+
+
+def _forward_deltas(job_store: JobStore, job_id: str, text_stream) -> None:
+    """Pushes streamed text into the job as "delta" events."""
+    buf: list[str] = []
+    buffered = 0
+    last_flush = time.monotonic()
+    for text in text_stream:
+        buf.append(text)
+        buffered += len(text)
+        now = time.monotonic()
+        if buffered >= DELTA_FLUSH_CHARS or now - last_flush >= DELTA_FLUSH_SECONDS:
+            job_store.push_delta(job_id, "".join(buf))
+            buf, buffered, last_flush = [], 0, now
+    if buf:
+        job_store.push_delta(job_id, "".join(buf))
+
+
+# ── Competitor page fetching ───────────────────────────────────────────────────
+
+def _download_page(url: str) -> tuple[bytes, str, str]:
+    """Returns (body, encoding, cache state) for `url`, going through the page cache.
+
+    Cache state is "hit" (fresh copy, no request), "revalidated" (304 from the
+    origin), "miss" (downloaded) or "off" (cache disabled). Requests take a
+    slot from the site's domain limiter without waiting: Throttled is raised
+    for _fetch_competitors to retry the page later.
+    """
+    entry = _page_cache.get(url) if _page_cache else None
+    if entry and _page_cache.is_fresh(entry):
+        return entry["body"], entry["meta"]["encoding"], "hit"
+
+    headers = dict(_FETCH_HEADERS)
+    if entry:
+        headers.update(_page_cache.conditional_headers(entry))
+    with _rate_limited(None, None, domain_limiter(url), "page", block=False):
+        # httpx's timeout bounds each connect/read; this bounds the whole page,
+        # so a server dripping bytes can't hold a fetch thread indefinitely.
+        deadline = time.monotonic() + PAGE_TIMEOUT
+        with get_http_client().stream(
+            "GET", url, headers=headers, timeout=PAGE_TIMEOUT, follow_redirects=True
+        ) as page_resp:
+            if entry and page_resp.status_code == 304:
+                _page_cache.refresh(entry, url)
+                return entry["body"], entry["meta"]["encoding"], "revalidated"
+            page_resp.raise_for_status()
+
+            content_type = page_resp.headers.get("content-type", "")
+            if content_type and not content_type.lower().startswith(_HTML_CONTENT_TYPES):
+                raise ValueError(f"not HTML: {content_type.split(';')[0]}")
+            body, encoding = _read_capped(page_resp, PAGE_MAX_BYTES, deadline)
+
+    if _page_cache:
+        _page_cache.put(url, body, page_resp.headers, encoding)
+    return body, encoding, "miss" if _page_cache else "off"
+
+
+def _read_capped(
+    page_resp, max_bytes: int, deadline: float | None = None
+) -> tuple[bytes, str]:
+    """Streams at most `max_bytes` of the body; returns (raw bytes, encoding).
+
+    The charset comes from the Content-Type header, else a <meta charset> in
+    the first chunk, else UTF-8. Decoding happens in the extraction process.
+    Raises TimeoutError once time.monotonic() passes `deadline`.
+    """
+    chunks: list[bytes] = []
+    encoding = page_resp.charset_encoding
+    received = 0
+    for chunk in page_resp.iter_bytes():
+        chunk = chunk[: max_bytes - received]
+        if not encoding and not chunks:
+            match = _META_CHARSET_RE.search(chunk[:2048])
+            encoding = match.group(1).decode("ascii") if match else None
+        received += len(chunk)
+        chunks.append(chunk)
+        if received >= max_bytes:
+            break  # leaving the stream context closes the connection early
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"page not received within {PAGE_TIMEOUT:.0f}s")
+    return b"".join(chunks), encoding or "utf-8"
+
+
+def _load_page(job_store: JobStore, job_id: str, i: int, url: str) -> tuple[str | None, str, str]:
+    """Downloads and extracts one page: (title or None, content, cache state)."""
+    t0 = time.perf_counter()
+    try:
+        body, encoding, cache_state = _download_page(url)
+    except Throttled:
+        raise  # no request was made; _fetch_competitors retries the page
+    except Exception as exc:
+        record_stage(job_store, job_id, "brief", "fetch", time.perf_counter() - t0, f"fetch[{i}]")
+        upstream_error("page", exc)
+        raise
+    record_stage(job_store, job_id, "brief", "fetch", time.perf_counter() - t0, f"fetch[{i}]")
+
+    with stage_timer(job_store, job_id, "brief", "parse", f"parse[{i}]"):
+        title, content_text = extract_html(body, encoding, PAGE_CONTENT_CHARS)
+    return title, content_text, cache_state
+
+
+def _load_coordinated(
+    job_store: JobStore, job_id: str, i: int, url: str
+) -> tuple[str | None, str, str]:
+    """_load_page() shared with concurrent jobs loading the same URL."""
+    (title, content_text, cache_state), shared = _url_fetches.load(
+        url, _load_page, job_store, job_id, i, url
+    )
+    return title, content_text, "shared" if shared else cache_state
 
-                h1 = soup.find("h1") or soup.find(class_="title") or soup.find(class_="post-title")
-                page_title = h1.get_text(strip=True)[:120] if h1 else fallback_title
-
-                competitor_data.append({
-                    "position": i,
-                    "url": url,
-                    "title": page_title,
-                    "content": content_text,
-                })
-                _push(job_store, job_id, f"Extracted content from page {i}: {page_title[:50]}")
 
+def _fetch_page(
+    job_store: JobStore,
+    job_id: str,
+    i: int,
+    url: str,
+    fallback_title: str,
+    fetch_memo: SingleFlight | None = None,
+) -> tuple[str, str, str]:
+    """Fetches one page and returns (title, content preview, cache state)."""
+    if fetch_memo is None:
+        title, content_text, cache_state = _load_coordinated(job_store, job_id, i, url)
+    else:
+        (title, content_text, cache_state), shared = fetch_memo.do(
+            url, _load_coordinated, job_store, job_id, i, url
+        )
+        if shared:
+            cache_state = "shared"
+    page_title = fallback_title if title is None else title
+    return page_title, content_text, cache_state
+
+
+def _fetch_competitors(
+    job_store: JobStore, job_id: str, organic: list[dict], fetch_memo: SingleFlight | None = None
+) -> list[dict]:
+    """Fetches all result pages in parallel; returns them ordered by SERP position.
+
+    Each page has FETCH_DEADLINE from when it is handed to the fetch pool. A
+    page whose domain limiter is busy comes back as Throttled and is held
+    here, off the pool, until the limiter has room; that wait doesn't count
+    against the deadline but is capped at DOMAIN_WAIT_LIMIT.
+    """
+    total = len(organic)
+    pending = {}
+    results: dict[int, dict] = {}
+    deadlines: dict[int, float] = {}
+    held: dict[int, float] = {}  # page → when to hand it back to the pool
+    throttled_since: dict[int, float] = {}
+    waited: dict[int, float] = {}
+
+    def submit(i: int) -> None:
+        now = time.monotonic()
+        if i in throttled_since:
+            waited[i] = now - throttled_since[i]
+        deadlines[i] = now + FETCH_DEADLINE
+        pending[_fetch_pool.submit(
+            _fetch_page, job_store, job_id, i, results[i]["url"], results[i]["title"], fetch_memo
+        )] = i
+
+    for i, result in enumerate(organic, 1):
+        url = result.get("link", "")
+        fallback_title = result.get("title", f"Page {i}")
+        results[i] = {"position": i, "url": url, "title": fallback_title, "content": ""}
+        _push(job_store, job_id, f"[{i}/{total}] Fetching {url[:70]}...")
+        submit(i)
+
+    while pending or held:
+        now = time.monotonic()
+        for i in [i for i, ready_at in held.items() if ready_at <= now]:
+            del held[i]
+            submit(i)
+        for future in [f for f, i in pending.items() if deadlines[i] <= now]:
+            i = pending.pop(future)
+            future.cancel()
+            upstream_error("page", TimeoutError())
+            _push(job_store, job_id, f"Skipped page {i} (no response within {FETCH_DEADLINE:.0f}s)")
+        wake = min([deadlines[i] for i in pending.values()] + list(held.values()), default=now)
+        if not pending:
+            time.sleep(max(0.0, wake - now))
+            continue
+        done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+        for future in done:
+            i = pending.pop(future)
+            try:
+                page_title, content_text, cache_state = future.result()
+            except Throttled as exc:
+                since = throttled_since.setdefault(i, time.monotonic())
+                if time.monotonic() + exc.retry_in - since > DOMAIN_WAIT_LIMIT:
+                    limit = f"{DOMAIN_WAIT_LIMIT:.0f}s"
+                    _push(job_store, job_id, f"Skipped page {i} (rate limited for over {limit})")
+                else:
+                    held[i] = time.monotonic() + exc.retry_in
+                continue
             except Exception as exc:
                 _push(job_store, job_id, f"Skipped page {i} ({exc})")
-                competitor_data.append({
-                    "position": i, "url": url, "title": fallback_title, "content": ""
-                })
-
-        # ── Step 3: Build AI prompt ────────────────────────────────────────────
-        _push(job_store, job_id, "Building competitor analysis prompt...")
-
-        comp_summary = "COMPETITOR ANALYSIS:\n\n"
-        for item in competitor_data:
-            if item["content"]:
-                comp_summary += f"Page {item['position']}: {item['title']}\n"
-                comp_summary += f"Content preview: {item['content']}...\n\n"
-
-        prompt = (
-            f'You are an expert SEO content strategist. Analyze the following competitor '
-            f'content for the keyword "{keyword}" and create a detailed content brief.\n\n'
-            f"{comp_summary}\n"
-            "Based on this analysis, provide the following sections. "
-            "Use proper Markdown formatting: ## for section headings, ### for sub-headings, "
-            "and - for bullet points.\n\n"
-            "## 1. Search Intent\n"
-            "What are users actually looking for?\n\n"
-            "## 2. Common Topics\n"
-            "What do all top-ranking pages cover?\n\n"
-            "## 3. Content Gaps\n"
-            "What is missing from most articles?\n\n"
-            "## 4. Recommended Structure\n"
-            "List the headings and sections we should include.\n\n"
-            "## 5. Word Count Target\n"
-            "Recommended word count based on competitor analysis.\n\n"
-            "## 6. Unique Angle\n"
-            "How can we stand out from competitors?\n\n"
-            "Be specific and actionable."
-        )
-
-        # ── Step 4: Claude analysis ────────────────────────────────────────────
-        _push(job_store, job_id, "Sending to Claude for content brief analysis...")
-        import anthropic
+                continue
+            results[i]["title"] = page_title
+            results[i]["content"] = content_text
+            _record_domain_wait(job_store, job_id, i, results[i]["url"], waited.get(i, 0.0))
+            if cache_state == "shared":
+                cache_note = " (shared with another brief)"
+            else:
+                cache_note = "" if cache_state == "off" else f" (cache {cache_state})"
+            _push(job_store, job_id, f"Extracted content from page {i}{cache_note}: {page_title[:50]}")
+
+    return [results[i] for i in sorted(results)]
+
+
+def _record_domain_wait(job_store: JobStore, job_id: str, i: int, url: str, seconds: float) -> None:
+    """Reports time page `i` spent held back by its domain limiter, like _rate_limited()."""
+    RATE_LIMIT_WAIT.observe(seconds, "page")
+    if seconds > 0.001:
+        job_store.record_timing(job_id, f"wait[{i}]", seconds)
+        if seconds >= RATE_WAIT_REPORT_SECONDS:
+            host = urlsplit(url).hostname
+            _push(job_store, job_id, f"Waited {seconds:.1f}s for the {host} rate limit...")
+
+
+# ── Prompt builder ─────────────────────────────────────────────────────────────
+
+# Identical for every brief, so it goes first as the system prefix; only the
+# keyword and competitor pages vary (see _build_prompt). At ~155 tokens it is
+# well below the 1024-token minimum Sonnet caches, so cache_control has no
+# effect at this size and usage["cache_read_input_tokens"] stays 0.
+BRIEF_INSTRUCTIONS = (
+    "You are an expert SEO content strategist.\n\n"
+    "Based on this analysis, provide the following sections. "
+    "Use proper Markdown formatting: ## for section headings, ### for sub-headings, "
+    "and - for bullet points.\n\n"
+    "## 1. Search Intent\n"
+    "What are users actually looking for?\n\n"
+    "## 2. Common Topics\n"
+    "What do all top-ranking pages cover?\n\n"
+    "## 3. Content Gaps\n"
+    "What is missing from most articles?\n\n"
+    "## 4. Recommended Structure\n"
+    "List the headings and sections we should include.\n\n"
+    "## 5. Word Count Target\n"
+    "Recommended word count based on competitor analysis.\n\n"
+    "## 6. Unique Angle\n"
+    "How can we stand out from competitors?\n\n"
+    "Be specific and actionable."
+)
+
+
+def _system_blocks() -> list[dict]:
+    block = {"type": "text", "text": BRIEF_INSTRUCTIONS}
+    if PROMPT_CACHE:
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def _build_prompt(
+    keyword: str, competitor_data: list[dict], budget: int | None = None
+) -> str:
+    """The per-brief user message: keyword plus the most relevant competitor passages."""
+    packed = pack_contents(
+        [item["content"] for item in competitor_data],
+        CONTEXT_TOKEN_BUDGET if budget is None else budget,
+        query=keyword,
+    )
+    comp_summary = "COMPETITOR ANALYSIS:\n\n"
+    for item, content in zip(competitor_data, packed):
+        if content:
+            comp_summary += f"Page {item['position']}: {item['title']}\n"
+            comp_summary += f"Content preview: {content}...\n\n"
+
+    return (
+        f'Analyze the following competitor content for the keyword "{keyword}" '
+        f"and create a detailed content brief.\n\n"
+        f"{comp_summary}"
+    )
 
-        ac = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        message = ac.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        brief_text = message.content[0].text
-        _push(job_store, job_id, "Claude analysis complete — formatting report...")
 
-        # ── Step 5: Format HTML report ─────────────────────────────────────────
-        report_html = _format_report(keyword, brief_text, competitor_data)
+def _max_tokens_for(pages: int) -> int:
+    return min(BRIEF_MAX_TOKENS, BRIEF_BASE_TOKENS + BRIEF_TOKENS_PER_PAGE * pages)
 
-        job_store[job_id]["report_html"] = report_html
-        job_store[job_id]["status"] = "complete"
-        _push(job_store, job_id, "Content brief ready!")
 
+def _generate_brief(
+    job_store: JobStore,
+    job_id: str,
+    prompt: str,
+    max_tokens: int = BRIEF_MAX_TOKENS,
+    force_refresh: bool = False,
+) -> str:
+    """Streams the brief from Claude, or replays a cached response to the same request."""
+    request = {
+        "model": BRIEF_MODEL,
+        "max_tokens": max_tokens,
+        "system": _system_blocks(),
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    key = cache_key(request)
+    cached = None if force_refresh else _llm_cache.get(key)
+    if cached is not None:
+        _push(job_store, job_id, "Identical prompt found — reusing cached Claude response")
+        job_store.push_delta(job_id, cached["text"])
+        return cached["text"]
+
+    # The SDK retries 429s itself; the limiter spaces requests out and pauses
+    # on the Retry-After of a rate-limit error that gets through.
+    try:
+        with _rate_limited(job_store, job_id, limiter("anthropic"), "anthropic"), \
+                get_anthropic_client().messages.stream(**request) as stream:
+            _forward_deltas(job_store, job_id, stream.text_stream)
+            message = stream.get_final_message()
     except Exception as exc:
-        import traceback
-        print(f"[brief error] {traceback.format_exc()}", flush=True)
-        job_store[job_id]["status"] = "error"
-        job_store[job_id]["error"] = str(exc)
-        _push(job_store, job_id, f"ERROR: {exc}")
+        upstream_error("anthropic", exc)
+        raise
+    _record_usage(job_store, job_id, message.usage)
+    text = message.content[0].text
+    # A response cut off at max_tokens is not worth replaying.
+    if getattr(message, "stop_reason", None) != "max_tokens":
+        _llm_cache.set(key, {"text": text})
+    return text
+
+
+def _record_usage(job_store: JobStore, job_id: str, usage) -> None:
+    """Stores token counts, including prompt cache reads/writes, on the job."""
+    counts = {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+    }
+    LLM_TOKENS.inc("input", amount=counts["input_tokens"])
+    LLM_TOKENS.inc("output", amount=counts["output_tokens"])
+    LLM_TOKENS.inc("cache_write", amount=counts["cache_creation_input_tokens"])
+    LLM_TOKENS.inc("cache_read", amount=counts["cache_read_input_tokens"])
+    job_store.update(job_id, usage=counts)
 
 
 # ── HTML formatter ─────────────────────────────────────────────────────────────
 
-def _format_report(keyword: str, brief_text: str, competitors: list) -> str:
+def _render_markdown(brief_text: str) -> str:
     import markdown as md_lib
 
+    return md_lib.markdown(brief_text, extensions=["extra", "nl2br"])
+
+
+def _format_report(keyword: str, brief_text: str, competitors: list) -> str:
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    brief_html = md_lib.markdown(brief_text, extensions=["extra", "nl2br"])
+    brief_html = _render_markdown(brief_text)
 
     comp_rows = "".join(
         f'<tr><td>{c["position"]}</td>'
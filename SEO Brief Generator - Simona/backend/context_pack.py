@@ -0,0 +1,87 @@
+"""
+Token-budgeted packing of competitor content into the brief prompt.
+
+One total budget is shared by the pages that produced text. Pages shorter
+than their fair share keep everything, and the slack they (and failed,
+empty pages) leave is split across the longer ones — water-filling, so no
+budget is wasted while any page still has text to give. Tokens are
+estimated locally from character counts; no tokenizer round-trip.
+
+Given the brief keyword, a page that needs trimming keeps its best BM25
+passages (passage_rank.py) rather than its first few hundred words, which
+are often cookie banners, breadcrumbs and intros.
+"""
+import math
+
+import numpy as np
+
+from passage_rank import bm25_scores, split_passages
+
+# English prose averages roughly four characters per Claude token.
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def allocate(sizes: list[int], budget: int) -> list[int]:
+    """Splits `budget` tokens across items needing `sizes` tokens each."""
+    alloc = [0] * len(sizes)
+    remaining = max(0, budget)
+    order = sorted(range(len(sizes)), key=sizes.__getitem__)
+    for n, i in enumerate(order):
+        share = remaining // (len(order) - n)
+        alloc[i] = min(sizes[i], share)
+        remaining -= alloc[i]
+    return alloc
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cuts text to about `tokens` tokens, on a word boundary where possible."""
+    limit = int(tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit + 1)
+    return text[:cut if cut > limit // 2 else limit].rstrip()
+
+
+def select_passages(passages: list[str], scores: np.ndarray, tokens: int) -> str:
+    """Highest-scoring passages that fit in `tokens`, joined in document order."""
+    if not passages:
+        return ""
+    order = np.argsort(-scores, kind="stable")  # ties keep document order
+    chosen, used = [], 0
+    for i in order:
+        size = estimate_tokens(passages[i])
+        if used + size <= tokens:
+            chosen.append(i)
+            used += size
+    if not chosen:
+        return truncate_to_tokens(passages[order[0]], tokens)
+    chosen.sort()
+    parts = [passages[chosen[0]]]
+    for prev, i in zip(chosen, chosen[1:]):
+        parts.append(passages[i] if i == prev + 1 else "… " + passages[i])
+    return " ".join(parts)
+
+
+def pack_contents(contents: list[str], budget: int, query: str | None = None) -> list[str]:
+    """Trims each text so together they fit in `budget` estimated tokens.
+
+    With a `query`, trimmed pages keep their most relevant passages;
+    without one they keep their head.
+    """
+    sizes = [estimate_tokens(text) for text in contents]
+    alloc = allocate(sizes, budget)
+    if not query:
+        return [truncate_to_tokens(text, n) for text, n in zip(contents, alloc)]
+
+    page_passages = [split_passages(text) for text in contents]
+    scores = bm25_scores([p for passages in page_passages for p in passages], query)
+    packed, offset = [], 0
+    for text, passages, size, n in zip(contents, page_passages, sizes, alloc):
+        page_scores = scores[offset:offset + len(passages)]
+        offset += len(passages)
+        packed.append(text if size <= n else select_passages(passages, page_scores, n))
+    return packed
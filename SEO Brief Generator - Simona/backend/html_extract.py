@@ -0,0 +1,169 @@
+"""
+Single-pass competitor page extractor built on lxml.
+
+Equivalent to the BeautifulSoup version it replaces: drop script/style/nav/
+footer/header, pick the content container by
+  article → .post-content → .entry-content → main → body
+and the title by h1 → .title → .post-title, then take stripped text joined
+with a space (content) or nothing (title). As with BeautifulSoup, text inside
+<template> only counts when the matched element is itself a <template>;
+any other element (inside a template or around one) skips it. One walk over
+the tree collects every text node and records where each candidate element's
+text starts and ends, so no selector needs its own traversal.
+
+Parsing is CPU-bound and holds the GIL, so extract_html() runs it in a warm
+ProcessPoolExecutor (EXTRACT_PROCESSES workers, started with
+start_extract_pool()); raw bytes go in, (title, content) comes back. Without
+a pool it runs inline.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import lxml.html
+from lxml import etree
+
+NOISE_TAGS = frozenset({"script", "style", "nav", "footer", "header"})
+
+# (match type, value) in precedence order.
+_CONTENT_SELECTORS = (
+    ("tag", "article"),
+    ("class", "post-content"),
+    ("class", "entry-content"),
+    ("tag", "main"),
+    ("tag", "body"),
+)
+_TITLE_SELECTORS = (
+    ("tag", "h1"),
+    ("class", "title"),
+    ("class", "post-title"),
+)
+_SELECTORS = _CONTENT_SELECTORS + _TITLE_SELECTORS
+
+
+def extract_page(
+    raw_html: str, max_content: int = 800, max_title: int = 120
+) -> tuple[str | None, str]:
+    """Returns (title or None if no title element, content text)."""
+    try:
+        root = lxml.html.document_fromstring(raw_html)
+    except (etree.ParserError, ValueError):
+        return None, ""
+
+    tokens: list[tuple[str, bool]] = []  # (text, inside a <template>)
+    first: dict[tuple[str, str], etree._Element] = {}
+    spans: dict[etree._Element, list[int]] = {}
+
+    def add(text: str | None, in_template: bool) -> None:
+        if text:
+            text = text.strip()
+            if text:
+                tokens.append((text, in_template))
+
+    # (element, exiting, inside a <template>)
+    stack: list[tuple[etree._Element, bool, bool]] = [(root, False, False)]
+    while stack:
+        el, exiting, in_template = stack.pop()
+        if exiting:
+            span = spans.get(el)
+            if span is not None:
+                span[1] = len(tokens)
+            add(el.tail, in_template)
+            continue
+
+        tag = el.tag
+        # Comments/processing instructions and noise subtrees contribute
+        # nothing themselves, but their tail text belongs to the parent.
+        if not isinstance(tag, str) or tag in NOISE_TAGS:
+            add(el.tail, in_template)
+            continue
+
+        if len(first) < len(_SELECTORS):
+            classes = el.get("class", "").split()
+            for selector in _SELECTORS:
+                if selector in first:
+                    continue
+                kind, value = selector
+                if (kind == "tag" and tag == value) or (kind == "class" and value in classes):
+                    first[selector] = el
+                    spans.setdefault(el, [len(tokens), len(tokens)])
+
+        inner = in_template or tag == "template"
+        add(el.text, inner)
+        stack.append((el, True, in_template))
+        for child in reversed(el):
+            stack.append((child, False, inner))
+
+    def text_of(el: etree._Element, sep: str) -> str:
+        start, end = spans[el]
+        template = el.tag == "template"
+        return sep.join(text for text, in_template in tokens[start:end] if in_template == template)
+
+    content_el = next((first[s] for s in _CONTENT_SELECTORS if s in first), None)
+    title_el = next((first[s] for s in _TITLE_SELECTORS if s in first), None)
+    content = text_of(content_el, " ")[:max_content] if content_el is not None else ""
+    title = text_of(title_el, "")[:max_title] if title_el is not None else None
+    return title, content
+
+
+def decode_html(body: bytes, encoding: str | None) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def extract_page_bytes(
+    body: bytes, encoding: str | None, max_content: int = 800
+) -> tuple[str | None, str]:
+    """Decodes raw page bytes and extracts them; the unit of work sent to the pool."""
+    return extract_page(decode_html(body, encoding), max_content)
+
+
+# ── Process pool ───────────────────────────────────────────────────────────────
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def start_extract_pool() -> None:
+    """Starts EXTRACT_PROCESSES workers up front (0 = extract inline)."""
+    global _pool
+    workers = int(os.getenv("EXTRACT_PROCESSES", str(min(4, os.cpu_count() or 1))))
+    if workers <= 0:
+        return
+    ctx = multiprocessing.get_context(os.getenv("EXTRACT_START_METHOD") or None)
+    with _pool_lock:
+        if _pool is not None:
+            return
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        # One task per worker forces every process to spawn now, not on the first brief.
+        for future in [_pool.submit(_warm) for _ in range(workers)]:
+            future.result()
+
+
+def shutdown_extract_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def extract_html(
+    body: bytes, encoding: str | None, max_content: int = 800
+) -> tuple[str | None, str]:
+    """Extracts a page in the process pool when running, else inline."""
+    pool = _pool
+    if pool is None:
+        return extract_page_bytes(body, encoding, max_content)
+    try:
+        return pool.submit(extract_page_bytes, body, encoding, max_content).result()
+    except BrokenProcessPool:
+        return extract_page_bytes(body, encoding, max_content)
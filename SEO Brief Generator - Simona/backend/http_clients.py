@@ -0,0 +1,81 @@
+"""
+Process-wide outbound clients — one pooled httpx.Client for Serper and
+competitor pages and one Anthropic client, shared by every worker so
+connections, TLS sessions and DNS results are reused across jobs.
+
+Created at app startup via init_clients() and closed on shutdown via
+close_clients(); the getters also create them lazily for standalone use.
+"""
+import os
+import threading
+
+import httpx
+
+# HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1.
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+HTTP2 = os.getenv("HTTP2", "1") == "1" and _HTTP2_AVAILABLE
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_anthropic_client = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Shared client for Serper and competitor pages. Pass per-request timeouts."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(http2=HTTP2, limits=_limits(), timeout=30)
+    return _http_client
+
+
+def get_anthropic_client():
+    """Shared Anthropic client backed by its own keep-alive connection pool."""
+    global _anthropic_client
+    if _anthropic_client is None:
+        with _lock:
+            if _anthropic_client is None:
+                import anthropic
+
+                _anthropic_client = anthropic.Anthropic(
+                    api_key=os.getenv("ANTHROPIC_API_KEY"),
+                    # Override to target a stub server (see loadtest/stub_server.py).
+                    base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+                    http_client=anthropic.DefaultHttpxClient(http2=HTTP2, limits=_limits()),
+                )
+    return _anthropic_client
+
+
+def init_clients() -> None:
+    get_http_client()
+    # Without a key the Anthropic client can't be built; jobs report that error.
+    if os.getenv("ANTHROPIC_API_KEY"):
+        get_anthropic_client()
+
+
+def close_clients() -> None:
+    global _http_client, _anthropic_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+        if _anthropic_client is not None:
+            _anthropic_client.close()
+            _anthropic_client = None
@@ -0,0 +1,63 @@
+"""
+Per-job change notifications bridged from worker threads to asyncio.
+
+Stream endpoints subscribe to a job and await changes; the job store calls
+notify() after every progress event or status update, from whatever thread
+made the write.
+"""
+import asyncio
+import threading
+
+
+class Subscription:
+    """One SSE subscriber: an asyncio.Event owned by the subscriber's loop."""
+
+    def __init__(self, job_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.job_id = job_id
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def reset(self) -> None:
+        """Call before reading job state so a change made mid-read still wakes wait()."""
+        self._event.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Waits up to `timeout` seconds for a change; True if one arrived."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # loop already closed; subscriber is gone
+
+
+class JobNotifier:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subs: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, job_id: str) -> Subscription:
+        """Must be called from the event loop that will await the subscription."""
+        sub = Subscription(job_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subs.setdefault(job_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.job_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.job_id]
+
+    def notify(self, job_id: str) -> None:
+        with self._lock:
+            subs = list(self._subs.get(job_id, ()))
+        for sub in subs:
+            sub._wake()
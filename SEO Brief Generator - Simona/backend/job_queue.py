@@ -0,0 +1,132 @@
+"""
+Bounded job executor — a fixed number of worker threads per job type fed by a
+FIFO admission queue, so a burst of submissions waits its turn instead of
+spawning one thread per request.
+"""
+import os
+import threading
+from collections import deque
+from typing import Any, Callable
+
+
+class JobPool:
+    """A FIFO queue drained by `workers` daemon threads."""
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = max(1, workers)
+        self._queue: deque[tuple[str, Callable[..., Any], tuple]] = deque()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._active = 0
+        self._stopping = False
+        # Jobs only ever leave from the head, so a job's queue position is its
+        # admission ticket minus the number of jobs already dequeued.
+        self._tickets: dict[str, int] = {}
+        self._admitted = 0
+        self._dequeued = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._worker, name=f"{self.name}-worker-{i}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> int:
+        """Queues a job and returns its 1-based position in the queue."""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError(f"{self.name} pool is shutting down")
+            self._ensure_started()
+            self._queue.append((job_id, fn, args))
+            self._admitted += 1
+            self._tickets[job_id] = self._admitted
+            self._cond.notify()
+            return self._admitted - self._dequeued
+
+    def position(self, job_id: str) -> int | None:
+        with self._cond:
+            ticket = self._tickets.get(job_id)
+            return None if ticket is None else ticket - self._dequeued
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {"workers": self.workers, "queued": len(self._queue), "active": self._active}
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                job_id, fn, args = self._queue.popleft()
+                self._dequeued += 1
+                self._tickets.pop(job_id, None)
+                self._active += 1
+            try:
+                fn(*args)
+            except Exception:
+                # Job functions record their own errors; never let one kill the worker.
+                import traceback
+                print(f"[{self.name} worker] {traceback.format_exc()}", flush=True)
+            finally:
+                with self._cond:
+                    self._active -= 1
+
+
+class JobExecutor:
+    """Routes jobs to the pool registered for their type.
+
+    Any object with JobPool's submit/position/stats/shutdown methods can be
+    registered, e.g. a pipeline.Pipeline.
+    """
+
+    def __init__(self) -> None:
+        self._pools: dict[str, Any] = {}
+
+    def add_pool(self, kind: str, workers: int) -> JobPool:
+        return self.register(kind, JobPool(kind, workers))
+
+    def register(self, kind: str, pool: Any) -> Any:
+        self._pools[kind] = pool
+        return pool
+
+    def __contains__(self, kind: str) -> bool:
+        return kind in self._pools
+
+    def submit(self, kind: str, job_id: str, *args: Any) -> int:
+        return self._pools[kind].submit(job_id, *args)
+
+    def position(self, job_id: str) -> int | None:
+        for pool in self._pools.values():
+            pos = pool.position(job_id)
+            if pos is not None:
+                return pos
+        return None
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {kind: pool.stats() for kind, pool in self._pools.items()}
+
+    def shutdown(self, timeout: float | None = 5.0) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(timeout)
+
+
+def build_executor() -> JobExecutor:
+    """Creates the app executor with worker counts taken from the environment."""
+    executor = JobExecutor()
+    executor.add_pool("research", int(os.getenv("RESEARCH_WORKERS", "2")))
+    executor.add_pool("brief", int(os.getenv("BRIEF_WORKERS", "4")))
+    return executor
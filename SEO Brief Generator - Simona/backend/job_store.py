@@ -0,0 +1,294 @@
+"""
+Job store — job records, progress events and reports.
+
+JobStore keeps everything in memory. SQLiteJobStore persists to a WAL-mode
+SQLite file and keeps the in-memory records as a read-through layer, so the
+status/stream endpoints never touch disk for active jobs. Pick the backend
+with JOB_STORE=memory|sqlite (path: JOB_STORE_PATH).
+
+Records are plain dicts: { job_id, kind, params, status, progress: [str],
+events: [(event, data)], timings: {stage: seconds}, usage: {LLM token
+counts}, report_html, report_sha256, report_size, error, created_at,
+updated_at }. `events` is the full SSE log — progress messages
+plus streamed LLM "delta" chunks — and its 1-based index is the SSE event
+id; `progress` holds just the progress messages. Treat records as read-only
+and go through push_progress()/push_delta()/record_timing()/update() for
+writes. Every write wakes the job's
+subscribers on `notifier`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from job_events import JobNotifier
+
+TERMINAL_STATUSES = ("complete", "error")
+
+
+def _set_report_digest(job: dict[str, Any]) -> None:
+    """Keeps report_sha256/report_size in step with report_html."""
+    report = job["report_html"]
+    if report is None:
+        job["report_sha256"] = job["report_size"] = None
+    else:
+        body = report.encode("utf-8")
+        job["report_sha256"] = hashlib.sha256(body).hexdigest()
+        job["report_size"] = len(body)
+
+
+class JobStore:
+    """In-memory backend; also the read-through layer for persistent ones."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self.notifier = JobNotifier()
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        return self._jobs.get(job_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def unfinished(self) -> list[dict[str, Any]]:
+        """Jobs left queued or running, oldest first."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j["status"] not in TERMINAL_STATUSES]
+        return sorted(jobs, key=lambda j: j["created_at"])
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def create(self, job_id: str, kind: str, params: dict[str, Any]) -> dict[str, Any]:
+        now = time.time()
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "progress": [],
+            "events": [],
+            "timings": {},
+            "usage": {},
+            "report_html": None,
+            "report_sha256": None,
+            "report_size": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._save_job(job)
+        return job
+
+    def push_progress(self, job_id: str, message: str) -> None:
+        self._push_event(job_id, "progress", message)
+
+    def push_delta(self, job_id: str, text: str) -> None:
+        """Appends a chunk of streamed LLM output."""
+        self._push_event(job_id, "delta", text)
+
+    def _push_event(self, job_id: str, event: str, data: str) -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return
+            job["events"].append((event, data))
+            if event == "progress":
+                job["progress"].append(data)
+            self._save_event(job_id, len(job["events"]), event, data)
+        self.notifier.notify(job_id)
+
+    def record_timing(self, job_id: str, stage: str, seconds: float) -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return
+            job["timings"][stage] = round(seconds, 4)
+            self._save_job(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Sets status / report_html / error / usage on a job."""
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if "report_html" in fields:
+                _set_report_digest(job)
+            job["updated_at"] = time.time()
+            self._save_job(job)
+        self.notifier.notify(job_id)
+
+    def close(self) -> None:
+        pass
+
+    # ── Persistence hooks (no-ops in memory) ──────────────────────────────────
+
+    def _save_job(self, job: dict[str, Any]) -> None:
+        pass
+
+    def _save_event(self, job_id: str, seq: int, event: str, data: str) -> None:
+        pass
+
+
+class SQLiteJobStore(JobStore):
+    """SQLite (WAL) backend with an LRU of finished jobs kept in memory."""
+
+    def __init__(self, path: str, cache_size: int = 500) -> None:
+        super().__init__()
+        self._cache_size = cache_size
+        self._jobs = OrderedDict()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id      TEXT PRIMARY KEY,
+                kind        TEXT NOT NULL,
+                params      TEXT NOT NULL,
+                status      TEXT NOT NULL,
+                report_html TEXT,
+                error       TEXT,
+                timings     TEXT NOT NULL DEFAULT '{}',
+                usage       TEXT NOT NULL DEFAULT '{}',
+                created_at  REAL NOT NULL,
+                updated_at  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+            CREATE TABLE IF NOT EXISTS job_progress (
+                job_id  TEXT NOT NULL,
+                seq     INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                event   TEXT NOT NULL DEFAULT 'progress',
+                PRIMARY KEY (job_id, seq)
+            );
+            """
+        )
+        self._add_column("job_progress", "event", "TEXT NOT NULL DEFAULT 'progress'")
+        self._add_column("jobs", "timings", "TEXT NOT NULL DEFAULT '{}'")
+        self._add_column("jobs", "usage", "TEXT NOT NULL DEFAULT '{}'")
+
+    def _add_column(self, table: str, column: str, decl: str) -> None:
+        """Upgrades databases created before `column` existed."""
+        columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        with self._lock:
+            job = self._jobs.get(job_id) or self._load(job_id)
+            if job is not None:
+                self._cache(job)
+            return job
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def unfinished(self) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at",
+                TERMINAL_STATUSES,
+            ).fetchall()
+        return [job for (job_id,) in rows if (job := self.get(job_id)) is not None]
+
+    def create(self, job_id: str, kind: str, params: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            job = super().create(job_id, kind, params)
+            self._cache(job)
+        return job
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _cache(self, job: dict[str, Any]) -> None:
+        self._jobs[job["job_id"]] = job
+        self._jobs.move_to_end(job["job_id"])
+        # Only finished jobs are evicted; active ones must stay live in memory.
+        excess = len(self._jobs) - self._cache_size
+        for old_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[old_id]["status"] in TERMINAL_STATUSES:
+                del self._jobs[old_id]
+                excess -= 1
+
+    def _load(self, job_id: str) -> dict[str, Any] | None:
+        row = self._db.execute(
+            "SELECT job_id, kind, params, status, report_html, error, created_at, updated_at, "
+            "timings, usage FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        events = [
+            (event, message) for (event, message) in self._db.execute(
+                "SELECT event, message FROM job_progress WHERE job_id = ? ORDER BY seq", (job_id,)
+            )
+        ]
+        progress = [message for event, message in events if event == "progress"]
+        job = {
+            "job_id": row[0],
+            "kind": row[1],
+            "params": json.loads(row[2]),
+            "status": row[3],
+            "progress": progress,
+            "events": events,
+            "timings": json.loads(row[8]),
+            "usage": json.loads(row[9]),
+            "report_html": row[4],
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7],
+        }
+        _set_report_digest(job)
+        return job
+
+    def _save_job(self, job: dict[str, Any]) -> None:
+        self._db.execute(
+            "INSERT INTO jobs (job_id, kind, params, status, report_html, error, timings, "
+            "usage, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, "
+            "report_html = excluded.report_html, error = excluded.error, "
+            "timings = excluded.timings, usage = excluded.usage, "
+            "updated_at = excluded.updated_at",
+            (
+                job["job_id"], job["kind"], json.dumps(job["params"]), job["status"],
+                job["report_html"], job["error"], json.dumps(job["timings"]),
+                json.dumps(job["usage"]), job["created_at"], job["updated_at"],
+            ),
+        )
+
+    def _save_event(self, job_id: str, seq: int, event: str, data: str) -> None:
+        self._db.execute(
+            "INSERT INTO job_progress (job_id, seq, event, message) VALUES (?, ?, ?, ?)",
+            (job_id, seq, event, data),
+        )
+
+
+def build_store() -> JobStore:
+    """Creates the store selected by JOB_STORE (default: sqlite)."""
+    backend = os.getenv("JOB_STORE", "sqlite").lower()
+    if backend == "memory":
+        return JobStore()
+    if backend == "sqlite":
+        path = os.getenv("JOB_STORE_PATH", os.path.join(os.path.dirname(__file__), "jobs.db"))
+        return SQLiteJobStore(path, cache_size=int(os.getenv("JOB_CACHE_SIZE", "500")))
+    raise ValueError(f"Unknown JOB_STORE backend: {backend}")
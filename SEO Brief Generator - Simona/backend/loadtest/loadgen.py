@@ -0,0 +1,126 @@
+"""
+Load generator for the content brief API.
+
+Submits N briefs (optionally at a fixed rate), attaches an SSE subscriber to
+each job and reports throughput, end-to-end latency percentiles (submit →
+terminal event) and error counts. Run it against a backend wired to
+loadtest/stub_server.py to find the saturation point of one instance:
+
+    python loadtest/loadgen.py --jobs 200 --rate 20 --output run.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+
+async def _read_sse(response: httpx.Response):
+    """Yields (event, data) pairs from an SSE response."""
+    event, data = "message", []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+
+
+async def run_one(client: httpx.AsyncClient, n: int, args, errors: Counter) -> float | None:
+    """Submits one brief and follows it to completion; returns latency or None."""
+    keyword = f"{args.keyword} {n}" if args.distinct else args.keyword
+    t0 = time.perf_counter()
+    try:
+        resp = await client.post("/api/content-brief", json={"keyword": keyword})
+        resp.raise_for_status()
+        job_id = resp.json()["job_id"]
+    except Exception as exc:
+        errors[f"submit: {type(exc).__name__}"] += 1
+        return None
+
+    try:
+        async with client.stream(
+            "GET", f"/api/content-brief/{job_id}/stream", timeout=None
+        ) as stream:
+            async for event, data in _read_sse(stream):
+                if event == "complete":
+                    if args.fetch_report:
+                        report_url = json.loads(data)["report_url"]
+                        (await client.get(report_url)).raise_for_status()
+                    return time.perf_counter() - t0
+                if event == "error":
+                    errors[f"job: {data[:60]}"] += 1
+                    return None
+    except Exception as exc:
+        errors[f"stream: {type(exc).__name__}"] += 1
+        return None
+    errors["stream: closed before terminal event"] += 1
+    return None
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def main_async(args) -> dict:
+    errors: Counter = Counter()
+    limits = httpx.Limits(max_connections=args.jobs + 10, max_keepalive_connections=args.jobs + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        t0 = time.perf_counter()
+        tasks = []
+        for n in range(args.jobs):
+            tasks.append(asyncio.create_task(run_one(client, n, args, errors)))
+            if args.rate:
+                await asyncio.sleep(1 / args.rate)
+        latencies = await asyncio.gather(*tasks)
+        wall = time.perf_counter() - t0
+
+    ok = sorted(l for l in latencies if l is not None)
+    return {
+        "jobs": args.jobs,
+        "rate": args.rate,
+        "completed": len(ok),
+        "failed": args.jobs - len(ok),
+        "wall_s": round(wall, 3),
+        "throughput_jobs_per_sec": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency_s": {
+            "p50": round(percentile(ok, 50), 3),
+            "p95": round(percentile(ok, 95), 3),
+            "p99": round(percentile(ok, 99), 3),
+            "max": round(ok[-1], 3) if ok else 0.0,
+        },
+        "errors": dict(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Content brief load generator")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--jobs", type=int, default=50, help="briefs to submit")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="submissions per second (0 = all at once)")
+    parser.add_argument("--keyword", default="load test keyword")
+    parser.add_argument("--same-keyword", dest="distinct", action="store_false",
+                        help="submit the same keyword every time (exercises caches)")
+    parser.add_argument("--fetch-report", action="store_true",
+                        help="also download each finished report")
+    parser.add_argument("--output", help="write the summary JSON here")
+    args = parser.parse_args()
+
+    summary = asyncio.run(main_async(args))
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
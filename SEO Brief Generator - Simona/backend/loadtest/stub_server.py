@@ -0,0 +1,262 @@
+"""
+Stub upstreams for offline load testing — Serper search, the Anthropic
+Messages API (plain and streaming) and competitor websites, each with
+configurable latency, error rate and payload size.
+
+    python loadtest/stub_server.py --port 9000 --page-kb 120 --llm-seconds 8
+
+Then start the backend against it:
+
+    SERPER_BASE_URL=http://127.0.0.1:9000 \\
+    ANTHROPIC_BASE_URL=http://127.0.0.1:9000 \\
+    SERPER_API_KEY=stub ANTHROPIC_API_KEY=stub python main.py
+
+Every stub competitor page is served from this one host, so the per-domain
+rate limiter would throttle all of them together. To measure the backend
+rather than the limiters, switch them off as well:
+
+    RATE_DOMAIN_RPS=0 RATE_DOMAIN_CONCURRENCY=0 \\
+    RATE_SERPER_RPS=0 RATE_SERPER_CONCURRENCY=0 \\
+    RATE_ANTHROPIC_RPS=0 RATE_ANTHROPIC_CONCURRENCY=0 python main.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+app = FastAPI(title="SEO Brief stub upstreams")
+
+# Replaced from the command line in main().
+config = SimpleNamespace(
+    public_url="http://127.0.0.1:9000",
+    results=5,
+    serper_ms=300.0,
+    serper_errors=0.0,
+    page_ms=800.0,
+    page_errors=0.0,
+    page_kb=60,
+    llm_ms_first=1000.0,
+    llm_seconds=10.0,
+    llm_tokens=1500,
+    llm_errors=0.0,
+    jitter=0.3,
+)
+
+_WORDS = (
+    "slot rtp volatility bonus spins wagering jackpot payline reels scatter wild "
+    "multiplier provider casino license withdrawal deposit mobile demo strategy "
+    "bankroll feature cascade megaways players review stake return"
+).split()
+
+
+async def _delay(ms: float) -> None:
+    await asyncio.sleep(max(0.0, ms * random.uniform(1 - config.jitter, 1 + config.jitter)) / 1000)
+
+
+def _failed(rate: float) -> bool:
+    return random.random() < rate
+
+
+def _words(n: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+# ── Serper ────────────────────────────────────────────────────────────────────
+
+@app.post("/search")
+async def search(request: Request):
+    await _delay(config.serper_ms)
+    if _failed(config.serper_errors):
+        return JSONResponse({"message": "Too many requests"}, status_code=429,
+                            headers={"Retry-After": "1"})
+    body = await request.json()
+    # A JSON array is a batch of queries; Serper answers with an array.
+    if isinstance(body, list):
+        return [_search_result(query) for query in body]
+    return _search_result(body)
+
+
+def _search_result(query: dict) -> dict:
+    slug = re.sub(r"[^a-z0-9]+", "-", str(query.get("q", "")).lower()).strip("-") or "query"
+    organic = [
+        {
+            "title": f"{slug.replace('-', ' ').title()} — result {i}",
+            "link": f"{config.public_url}/pages/{slug}-{i}",
+            "snippet": _words(20, i),
+            "position": i,
+        }
+        for i in range(1, config.results + 1)
+    ]
+    return {"searchParameters": {"q": query.get("q")}, "organic": organic}
+
+
+# ── Competitor pages ──────────────────────────────────────────────────────────
+
+_page_cache: dict[int, str] = {}
+
+
+def _page_html(kb: int) -> str:
+    if kb not in _page_cache:
+        paras, i = [], 0
+        while sum(len(p) for p in paras) < kb * 1024:
+            paras.append(f"<h2>{_words(6, i)}</h2><p>{_words(120, i + 1)}</p>")
+            i += 2
+        _page_cache[kb] = (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Stub page</title>"
+            "<script>var tracking = true;</script></head><body>"
+            "<header><nav><a href='/'>Home</a><a href='/slots'>Slots</a></nav></header>"
+            f"<article><h1>{_words(8, kb)}</h1>{''.join(paras)}</article>"
+            "<footer>Stub footer</footer></body></html>"
+        )
+    return _page_cache[kb]
+
+
+@app.get("/pages/{name}")
+async def page(name: str):
+    await _delay(config.page_ms)
+    if _failed(config.page_errors):
+        return HTMLResponse("<h1>Service unavailable</h1>", status_code=503)
+    return HTMLResponse(_page_html(config.page_kb))
+
+
+# ── Anthropic Messages API ────────────────────────────────────────────────────
+
+def _brief_chunks() -> list[str]:
+    """A markdown brief of roughly llm_tokens tokens, split into ~token chunks."""
+    sections = ["Search Intent", "Common Topics", "Content Gaps",
+                "Recommended Structure", "Word Count Target", "Unique Angle"]
+    per_section = max(1, config.llm_tokens // len(sections))
+    chunks = []
+    for n, title in enumerate(sections, 1):
+        chunks.append(f"## {n}. {title}\n\n")
+        words = _words(per_section, n).split()
+        for j, word in enumerate(words):
+            chunks.append(("- " if j % 15 == 0 else "") + word + ("\n" if j % 15 == 14 else " "))
+        chunks.append("\n\n")
+    return chunks
+
+
+# System prefixes marked with cache_control that have been "cached" already.
+_cached_prefixes: set[str] = set()
+# Like the API, shorter cache_control prefixes are sent uncached.
+MIN_CACHEABLE_TOKENS = 1024
+
+
+def _usage(body: dict) -> dict:
+    """Token counts, mimicking prompt cache writes and reads for cached system blocks."""
+    system = body.get("system") or []
+    if isinstance(system, str):
+        system = [{"type": "text", "text": system}]
+    cached = "".join(b.get("text", "") for b in system if b.get("cache_control"))
+    uncached = "".join(b.get("text", "") for b in system if not b.get("cache_control"))
+    usage = {
+        "input_tokens": (len(uncached) + len(json.dumps(body.get("messages", [])))) // 4,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 0,
+    }
+    if len(cached) // 4 >= MIN_CACHEABLE_TOKENS:
+        hit = cached in _cached_prefixes
+        _cached_prefixes.add(cached)
+        usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = len(cached) // 4
+    else:
+        usage["input_tokens"] += len(cached) // 4
+    return usage
+
+
+def _message(text: str, model: str, usage: dict, output_tokens: int) -> dict:
+    return {
+        "id": f"msg_stub_{random.getrandbits(48):012x}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {**usage, "output_tokens": output_tokens},
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/v1/messages")
+async def messages(request: Request):
+    body = await request.json()
+    await _delay(config.llm_ms_first)
+    if _failed(config.llm_errors):
+        return JSONResponse(
+            {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+            status_code=529,
+        )
+
+    model = body.get("model", "stub")
+    usage = _usage(body)
+    chunks = _brief_chunks()
+    if not body.get("stream"):
+        await asyncio.sleep(config.llm_seconds)
+        return _message("".join(chunks), model, usage, len(chunks))
+
+    async def events():
+        start = _message("", model, usage, 1)
+        start["content"], start["stop_reason"] = [], None
+        yield _sse("message_start", {"type": "message_start", "message": start})
+        yield _sse("content_block_start", {
+            "type": "content_block_start", "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        })
+        pause = config.llm_seconds / max(1, len(chunks))
+        for chunk in chunks:
+            await asyncio.sleep(pause)
+            yield _sse("content_block_delta", {
+                "type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": chunk},
+            })
+        yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+        yield _sse("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(chunks)},
+        })
+        yield _sse("message_stop", {"type": "message_stop"})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stub Serper / Anthropic / competitor sites")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--results", type=int, default=config.results, help="organic results per search")
+    parser.add_argument("--serper-ms", type=float, default=config.serper_ms, help="search latency")
+    parser.add_argument("--serper-errors", type=float, default=config.serper_errors, help="429 rate, 0-1")
+    parser.add_argument("--page-ms", type=float, default=config.page_ms, help="page latency")
+    parser.add_argument("--page-errors", type=float, default=config.page_errors, help="503 rate, 0-1")
+    parser.add_argument("--page-kb", type=int, default=config.page_kb, help="page size")
+    parser.add_argument("--llm-ms-first", type=float, default=config.llm_ms_first,
+                        help="latency before the first token")
+    parser.add_argument("--llm-seconds", type=float, default=config.llm_seconds,
+                        help="time spent streaming the response")
+    parser.add_argument("--llm-tokens", type=int, default=config.llm_tokens, help="response size")
+    parser.add_argument("--llm-errors", type=float, default=config.llm_errors, help="529 rate, 0-1")
+    parser.add_argument("--jitter", type=float, default=config.jitter,
+                        help="latency varies uniformly by ± this fraction")
+    args = parser.parse_args()
+
+    for key, value in vars(args).items():
+        if hasattr(config, key):
+            setattr(config, key, value)
+    config.public_url = f"http://{args.host}:{args.port}"
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
 import asyncio
+import gzip
 import os
 import sys
-import uuid
 import threading
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response
 from sse_starlette.sse import EventSourceResponse
 
 load_dotenv()
@@ -16,7 +20,33 @@ load_dotenv()
 # Ensure backend/ is on sys.path so crew imports work
 sys.path.insert(0, os.path.dirname(__file__))
 
-app = FastAPI(title="Casino SEO Research API", version="1.0.0")
+from html_extract import shutdown_extract_pool, start_extract_pool  # noqa: E402
+from http_clients import close_clients, init_clients  # noqa: E402
+from job_queue import build_executor  # noqa: E402
+from job_store import TERMINAL_STATUSES, build_store  # noqa: E402
+from metrics import (  # noqa: E402
+    BRIEFS_COALESCED, JOBS_FINISHED, Gauge, register, render_latest, stage_timer, upstream_error,
+)
+from rate_limit import Throttled, limiter, stats as limiter_stats  # noqa: E402
+
+# Re-run jobs that were running when the server stopped instead of failing them.
+RESUME_INTERRUPTED_JOBS = os.getenv("RESUME_INTERRUPTED_JOBS", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Prefork extraction workers before any job threads exist.
+    start_extract_pool()
+    init_clients()
+    _recover_jobs()
+    yield
+    executor.shutdown()
+    close_clients()
+    shutdown_extract_pool()
+    job_store.close()
+
+
+app = FastAPI(title="Casino SEO Research API", version="1.0.0", lifespan=lifespan)
 
 # ── CORS ──────────────────────────────────────────────────────────────────────
 # "null" (string) covers browsers opening seo-research.html via file:// protocol
@@ -39,15 +69,32 @@ app.add_middleware(
 )
 
 # ── Job store ─────────────────────────────────────────────────────────────────
-# { job_id: { status, progress: [str], report_html, error } }
-job_store: dict[str, dict[str, Any]] = {}
+# Persistent (JOB_STORE=sqlite) or in-memory; see job_store.py for the record shape.
+job_store = build_store()
+
+# ── Job executor ──────────────────────────────────────────────────────────────
+# Fixed worker pools per job type (RESEARCH_WORKERS / BRIEF_WORKERS) fed by a
+# FIFO admission queue — bursts wait in line instead of spawning threads.
+executor = build_executor()
+
+register(Gauge(
+    "seo_queue_depth", "Jobs waiting for a worker", ("kind",),
+    lambda: {(kind,): s["queued"] for kind, s in executor.stats().items()},
+))
+register(Gauge(
+    "seo_active_jobs", "Jobs currently running", ("kind",),
+    lambda: {(kind,): s["active"] for kind, s in executor.stats().items()},
+))
+register(Gauge(
+    "seo_workers", "Worker threads per job type", ("kind",),
+    lambda: {(kind,): s["workers"] for kind, s in executor.stats().items()},
+))
 
 
 # ── Background worker ─────────────────────────────────────────────────────────
 
 def _push_progress(job_id: str, message: str) -> None:
-    if job_id in job_store:
-        job_store[job_id]["progress"].append(message)
+    job_store.push_progress(job_id, message)
 
 
 def _make_step_callback(job_id: str):
@@ -71,36 +118,57 @@ def _run_crew(job_id: str, game_name: str) -> None:
     """Runs the SEO crew in a background thread."""
     try:
         _push_progress(job_id, f"Starting research for: {game_name}")
-        job_store[job_id]["status"] = "running"
+        job_store.update(job_id, status="running")
 
         from crew.seo_crew import build_seo_crew
 
         step_cb = _make_step_callback(job_id)
-        crew = build_seo_crew(game_name, step_callback=step_cb)
-
-        _push_progress(job_id, "Crew assembled — running SEO Keyword Agent...")
-        result = crew.kickoff()
-
-        # Extract HTML from result
-        if hasattr(result, "raw"):
-            report_html = result.raw
-        else:
-            report_html = str(result)
+        with stage_timer(job_store, job_id, "research", "build"):
+            crew = build_seo_crew(game_name, step_callback=step_cb)
+
+        # A crew run makes many Claude calls that don't go through our client,
+        # so it is limited as a whole: the crew limiter caps runs in flight,
+        # and each run also holds a slot and a token of the shared anthropic
+        # limiter, so research and briefs draw on one Anthropic budget.
+        crew_limiter, anthropic_limiter = limiter("crew"), limiter("anthropic")
+        try:
+            with crew_limiter.slot() as crew_wait, anthropic_limiter.slot() as anthropic_wait:
+                waited = crew_wait + anthropic_wait
+                if waited > 0.001:
+                    job_store.record_timing(job_id, "wait[crew]", waited)
+                    _push_progress(job_id, f"Waited {waited:.1f}s for the crew rate limit...")
+                _push_progress(job_id, "Crew assembled — running SEO Keyword Agent...")
+                with stage_timer(job_store, job_id, "research", "crew"):
+                    result = crew.kickoff()
+        except Exception as exc:
+            upstream_error("crew", exc)
+            crew_limiter.backoff(exc)
+            anthropic_limiter.backoff(exc)
+            raise
+
+        with stage_timer(job_store, job_id, "research", "render"):
+            # Extract HTML from result
+            if hasattr(result, "raw"):
+                report_html = result.raw
+            else:
+                report_html = str(result)
 
-        # Ensure it's actually HTML; if not, wrap it
-        if not report_html.strip().startswith("<!"):
-            report_html = _wrap_in_html(report_html, game_name)
+            # Ensure it's actually HTML; if not, wrap it
+            if not report_html.strip().startswith("<!"):
+                report_html = _wrap_in_html(report_html, game_name)
 
-        job_store[job_id]["report_html"] = report_html
-        job_store[job_id]["status"] = "complete"
+        # Progress before status — the SSE terminal event takes the next id.
         _push_progress(job_id, "Research complete!")
+        job_store.update(job_id, report_html=report_html, status="complete")
+        JOBS_FINISHED.inc("research", "complete")
+        _warm_report(job_id)
 
     except Exception as exc:
         import traceback
         tb = traceback.format_exc()
-        job_store[job_id]["status"] = "error"
-        job_store[job_id]["error"] = str(exc)
         _push_progress(job_id, f"ERROR: {exc}")
+        job_store.update(job_id, status="error", error=str(exc))
+        JOBS_FINISHED.inc("research", "error")
         print(f"[crew error] {tb}", flush=True)
 
 
@@ -129,100 +197,418 @@ def _wrap_in_html(content: str, game_name: str) -> str:
 </html>"""
 
 
-# ── Endpoints ─────────────────────────────────────────────────────────────────
+# ── Dispatch + restart recovery ───────────────────────────────────────────────
+
+def _enqueue(job: dict[str, Any]) -> int:
+    """Submits a stored job to its executor pool; returns its queue position."""
+    job_id, params = job["job_id"], job["params"]
+    if job["kind"] == "research":
+        # crew.kickoff() is synchronous/blocking — run it on the research pool
+        return executor.submit("research", job_id, _run_crew, job_id, params["game_name"])
+
+    if params.get("batch_id"):
+        from brief_worker import BriefRun
+
+        run = BriefRun(
+            job_store, job_id, params["keyword"], params["competitor_urls"] or None,
+            params.get("force_refresh", False), _batch_memo(params["batch_id"]),
+        )
+        _ensure_batch_pipeline()
+        return executor.submit("batch", job_id, run)
+    if not params.get("force_refresh"):
+        with _in_flight_lock:
+            _in_flight.setdefault(_coalesce_key(params), job_id)
+    return executor.submit(
+        "brief", job_id,
+        _run_brief, job_id, params["keyword"], params["competitor_urls"] or None,
+        params.get("force_refresh", False),
+    )
 
-from schemas.models import ResearchRequest, ResearchResponse, JobStatus, ContentBriefRequest  # noqa: E402
 
+# ── Coalescing ────────────────────────────────────────────────────────────────
+# A brief submitted while an identical one (same normalized keyword and
+# competitor URLs) is queued or running attaches to that job instead of
+# repeating its Serper, fetch and Claude calls. force_refresh opts out.
 
-@app.post("/api/research", response_model=ResearchResponse)
-async def start_research(request: ResearchRequest, background_tasks: BackgroundTasks):
-    game_name = request.game_name.strip()
-    if not game_name:
-        raise HTTPException(status_code=422, detail="game_name cannot be empty")
+_in_flight: dict[tuple, str] = {}
+_in_flight_lock = threading.Lock()
 
-    job_id = str(uuid.uuid4())
-    job_store[job_id] = {
-        "status": "queued",
-        "progress": [],
-        "report_html": None,
-        "error": None,
-    }
 
-    # Run crew in a real thread (crew.kickoff() is synchronous/blocking)
-    thread = threading.Thread(target=_run_crew, args=(job_id, game_name), daemon=True)
-    thread.start()
+def _coalesce_key(params: dict[str, Any]) -> tuple:
+    from brief_worker import normalize_keyword
 
-    return ResearchResponse(job_id=job_id)
+    urls = tuple(url.strip() for url in params["competitor_urls"] or ())
+    return normalize_keyword(params["keyword"]), urls
 
 
-@app.get("/api/research/{job_id}/stream")
-async def stream_research(job_id: str):
-    if job_id not in job_store:
-        raise HTTPException(status_code=404, detail="Job not found")
+def _find_in_flight(params: dict[str, Any]) -> str | None:
+    """Job id of an unfinished brief with the same inputs, if any."""
+    key = _coalesce_key(params)
+    with _in_flight_lock:
+        job_id = _in_flight.get(key)
+        if job_id is None:
+            return None
+        job = job_store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            _in_flight.pop(key, None)
+            return None
+        return job_id
+
+
+def _run_brief(
+    job_id: str, keyword: str, competitor_urls: list[str] | None, force_refresh: bool
+) -> None:
+    from brief_worker import run_content_brief
+
+    try:
+        run_content_brief(job_store, job_id, keyword, competitor_urls, force_refresh)
+        _warm_report(job_id)
+    finally:
+        with _in_flight_lock:
+            for key in [k for k, v in _in_flight.items() if v == job_id]:
+                del _in_flight[key]
 
-    async def event_generator():
-        last_idx = 0
-        heartbeat_counter = 0
+
+# ── Batches ───────────────────────────────────────────────────────────────────
+# A batch is a job record of kind "batch" listing its brief jobs. The briefs
+# are ordinary jobs, but they run on the "batch" pipeline (search, fetch, llm
+# and render each with their own workers, so keywords overlap across stages)
+# and share one SingleFlight memo, so a URL ranking for several keywords is
+# fetched and extracted once per batch.
+
+BATCH_MAX_KEYWORDS = int(os.getenv("BATCH_MAX_KEYWORDS", "500"))
+
+_batch_memos: dict[str, Any] = {}
+_batch_lock = threading.Lock()
+
+
+def _batch_memo(batch_id: str):
+    from url_fetch import SingleFlight
+
+    with _batch_lock:
+        return _batch_memos.setdefault(batch_id, SingleFlight(keep=True, transient=(Throttled,)))
+
+
+def _ensure_batch_pipeline() -> None:
+    """Registers the batch pipeline with the executor on first use."""
+    from brief_worker import build_batch_pipeline
+
+    with _batch_lock:
+        if "batch" not in executor:
+            executor.register("batch", build_batch_pipeline(_batch_brief_finished))
+
+
+def _batch_brief_finished(run) -> None:
+    _warm_report(run.job_id)
+    job = job_store.get(run.job_id)
+    batch_id = job["params"]["batch_id"]
+    # Under the lock, so no other brief can complete the batch between this
+    # line and the check — nothing may follow the batch's terminal status.
+    with _batch_lock:
+        _push_progress(batch_id, f"{run.keyword}: {job['status']}")
+        _close_batch_if_done(batch_id)
+
+
+def _batch_counts(batch: dict[str, Any]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for job_id in dict.fromkeys(item["job_id"] for item in batch["params"]["items"]):
+        job = job_store.get(job_id)
+        status = job["status"] if job else "error"
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _finish_batch_if_done(batch_id: str) -> None:
+    with _batch_lock:
+        _close_batch_if_done(batch_id)
+
+
+def _close_batch_if_done(batch_id: str) -> None:
+    """Completes the batch once all its briefs are terminal. Holds _batch_lock."""
+    batch = job_store.get(batch_id)
+    if batch is None or batch["status"] == "complete":
+        return
+    counts = _batch_counts(batch)
+    if any(status not in TERMINAL_STATUSES for status in counts):
+        return
+    _batch_memos.pop(batch_id, None)
+    _push_progress(
+        batch_id,
+        f"Batch finished: {counts.get('complete', 0)} complete, {counts.get('error', 0)} failed",
+    )
+    job_store.update(batch_id, status="complete")
+
+
+def _recover_jobs() -> None:
+    """Re-enqueues jobs left queued by the previous process; handles interrupted ones."""
+    for job in job_store.unfinished():
+        job_id = job["job_id"]
+        if job["kind"] == "batch":
+            # Its briefs are recovered on their own; close it if they all finished.
+            _finish_batch_if_done(job_id)
+            continue
+        if job["status"] == "running" and not RESUME_INTERRUPTED_JOBS:
+            _push_progress(job_id, "ERROR: Interrupted by server restart")
+            job_store.update(job_id, status="error", error="Interrupted by server restart")
+            if job["params"].get("batch_id"):
+                _finish_batch_if_done(job["params"]["batch_id"])
+            continue
+        if job["status"] == "running":
+            job_store.update(job_id, status="queued")
+            _push_progress(job_id, "Resuming after server restart...")
+        position = _enqueue(job)
+        _push_progress(job_id, f"Re-queued after restart (position {position})")
+
+
+# ── SSE streaming ─────────────────────────────────────────────────────────────
+
+HEARTBEAT_INTERVAL = 15  # seconds; keeps proxies/browsers from dropping idle streams
+
+
+def _parse_last_event_id(last_event_id: str | None) -> int:
+    try:
+        return max(0, int(last_event_id or 0))
+    except ValueError:
+        return 0
+
+
+async def _job_event_stream(job_id: str, last_event_id: int = 0):
+    """Yields progress events as they land, then one terminal complete/error event.
+
+    Streamed LLM output is forwarded as "delta" events. Event ids are the
+    1-based position in the job's event log (the terminal event takes the
+    next one), so a reconnect carrying Last-Event-ID resumes right after the
+    last event the client saw. Wakes on job store notifications
+    rather than polling; heartbeats run on their own timer, carry no id and
+    are only sent while the job is quiet.
+    """
+    sub = job_store.notifier.subscribe(job_id)
+    try:
+        last_idx = last_event_id
+        loop = asyncio.get_running_loop()
+        next_heartbeat = loop.time() + HEARTBEAT_INTERVAL
 
         while True:
+            sub.reset()
             job = job_store.get(job_id)
             if job is None:
                 yield {"event": "error", "data": "Job not found"}
                 return
 
-            # Send any new progress messages
-            progress = job.get("progress", [])
-            while last_idx < len(progress):
-                yield {"event": "progress", "data": progress[last_idx]}
+            # Send any new progress messages / deltas
+            events = job["events"]
+            while last_idx < len(events):
+                event, data = events[last_idx]
+                yield {"event": event, "id": str(last_idx + 1), "data": data}
                 last_idx += 1
 
-            status = job.get("status")
+            status = job["status"]
 
             # Terminal state: complete or error
             if status == "complete":
                 import json as _json
-                payload = _json.dumps({
-                    "report_html": job.get("report_html", ""),
-                })
-                yield {"event": "complete", "data": payload}
+                payload = _json.dumps(_report_fields(job))
+                yield {"event": "complete", "id": str(len(events) + 1), "data": payload}
                 return
             elif status == "error":
-                yield {"event": "error", "data": job.get("error", "Unknown error")}
+                yield {
+                    "event": "error",
+                    "id": str(len(events) + 1),
+                    "data": job.get("error") or "Unknown error",
+                }
                 return
 
-            # Heartbeat every ~15 s to keep proxy/browser alive
-            heartbeat_counter += 1
-            if heartbeat_counter >= 15:
+            if not await sub.wait(max(0.0, next_heartbeat - loop.time())):
                 yield {"event": "heartbeat", "data": "ping"}
-                heartbeat_counter = 0
+                next_heartbeat = loop.time() + HEARTBEAT_INTERVAL
+    finally:
+        job_store.notifier.unsubscribe(sub)
+
 
-            await asyncio.sleep(1)
+# ── Report delivery ───────────────────────────────────────────────────────────
+# Reports are served from their own endpoint rather than inline in the SSE
+# "complete" event or the status response, which only carry url/size/hash.
 
-    return EventSourceResponse(event_generator())
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+_REPORT_PREFIX = {"research": "/api/research", "brief": "/api/content-brief"}
+
+# Compressed bodies keyed by (sha256, encoding); reports are immutable once set.
+# Workers fill it when a report is finished (_warm_report), so the request
+# path normally just looks it up.
+_compressed_reports: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+_compressed_lock = threading.Lock()
+_COMPRESSED_CACHE_SIZE = 64
+# Brotli's default quality 11 takes ~1 s on a few hundred KB of HTML; 5 is
+# within a few percent of its size at a fraction of the time.
+REPORT_BROTLI_QUALITY = int(os.getenv("REPORT_BROTLI_QUALITY", "5"))
+
+
+def _report_fields(job: dict[str, Any]) -> dict[str, Any]:
+    if not job.get("report_html"):
+        return {"report_url": None, "report_size": None, "report_sha256": None}
+    return {
+        "report_url": f"{_REPORT_PREFIX[job['kind']]}/{job['job_id']}/report",
+        "report_size": job["report_size"],
+        "report_sha256": job["report_sha256"],
+    }
+
+
+def _pick_encoding(accept_encoding: str) -> str:
+    """Chooses br > gzip > identity from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def _encoded_report(job: dict[str, Any], encoding: str) -> bytes:
+    body = job["report_html"].encode("utf-8")
+    if encoding == "identity":
+        return body
+    key = (job["report_sha256"], encoding)
+    with _compressed_lock:
+        cached = _compressed_reports.get(key)
+    if cached is None:
+        if encoding == "br":
+            cached = brotli.compress(body, quality=REPORT_BROTLI_QUALITY)
+        else:
+            cached = gzip.compress(body, 6)
+        with _compressed_lock:
+            _compressed_reports[key] = cached
+            while len(_compressed_reports) > _COMPRESSED_CACHE_SIZE:
+                _compressed_reports.popitem(last=False)
+    return cached
+
+
+def _warm_report(job_id: str) -> None:
+    """Compresses a finished report on the worker thread, ahead of the first fetch."""
+    job = job_store.get(job_id)
+    if job is None or job["status"] != "complete" or not job.get("report_html"):
+        return
+    for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+        _encoded_report(job, encoding)
+
+
+async def _report_response(job_id: str, request: Request) -> Response:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "complete" or not job.get("report_html"):
+        raise HTTPException(status_code=404, detail="Report not ready")
+
+    etag = f'"{job["report_sha256"]}"'
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "private, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")] or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        # Off the event loop in case the worker hasn't compressed it yet.
+        content=await asyncio.to_thread(_encoded_report, job, encoding),
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+from schemas.models import ResearchRequest, ResearchResponse, JobStatus, ContentBriefRequest  # noqa: E402
+from schemas.models import (  # noqa: E402
+    BatchJob, BatchResponse, BatchStatus, ContentBriefBatchRequest,
+)
+
+
+@app.post("/api/research", response_model=ResearchResponse)
+async def start_research(request: ResearchRequest, background_tasks: BackgroundTasks):
+    game_name = request.game_name.strip()
+    if not game_name:
+        raise HTTPException(status_code=422, detail="game_name cannot be empty")
+
+    job_id = str(uuid.uuid4())
+    job = job_store.create(job_id, "research", {"game_name": game_name})
+    position = _enqueue(job)
+    _push_progress(job_id, f"Queued (position {position})")
+
+    return ResearchResponse(job_id=job_id)
+
+
+@app.get("/api/research/{job_id}/stream")
+async def stream_research(job_id: str, last_event_id: str | None = Header(default=None)):
+    if job_id not in job_store:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return EventSourceResponse(_job_event_stream(job_id, _parse_last_event_id(last_event_id)))
 
 
 @app.get("/api/research/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str):
     if job_id not in job_store:
         raise HTTPException(status_code=404, detail="Job not found")
-    job = job_store[job_id]
+    job = job_store.get(job_id)
     return JobStatus(
         job_id=job_id,
         status=job["status"],
         progress=job["progress"],
-        report_html=job.get("report_html"),
+        **_report_fields(job),
         error=job.get("error"),
+        queue_position=executor.position(job_id),
+        timings=job["timings"],
+        usage=job["usage"],
+    )
+
+
+@app.get("/api/research/{job_id}/report")
+async def get_research_report(job_id: str, request: Request):
+    return await _report_response(job_id, request)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8"
     )
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "jobs": len(job_store)}
+    from brief_worker import cache_stats
+
+    return {
+        "status": "ok",
+        "jobs": len(job_store),
+        "queues": executor.stats(),
+        "caches": cache_stats(),
+        "rate_limits": limiter_stats(),
+    }
 
 
 # ── Content Brief endpoints ────────────────────────────────────────────────────
 
-# Reuse the same job_store — brief jobs are prefixed with "brief-" in their id.
+# Reuse the same job_store — brief jobs are prefixed with "brief-" in their id
+# and stored with kind "brief".
 
 @app.post("/api/content-brief", response_model=ResearchResponse)
 async def start_content_brief(request: ContentBriefRequest):
@@ -230,85 +616,155 @@ async def start_content_brief(request: ContentBriefRequest):
     if not keyword:
         raise HTTPException(status_code=422, detail="keyword cannot be empty")
 
-    from brief_worker import run_content_brief
-
-    job_id = "brief-" + str(uuid.uuid4())
-    job_store[job_id] = {
-        "status": "queued",
-        "progress": [],
-        "report_html": None,
-        "error": None,
+    params = {
+        "keyword": keyword,
+        "competitor_urls": request.competitor_urls,
+        "force_refresh": request.force_refresh,
     }
+    if not request.force_refresh:
+        existing = _find_in_flight(params)
+        if existing is not None:
+            BRIEFS_COALESCED.inc()
+            _push_progress(existing, "Identical request attached to this brief")
+            return ResearchResponse(job_id=existing, coalesced=True)
 
-    thread = threading.Thread(
-        target=run_content_brief,
-        args=(job_store, job_id, keyword, request.competitor_urls or None),
-        daemon=True,
-    )
-    thread.start()
+    job_id = "brief-" + str(uuid.uuid4())
+    job = job_store.create(job_id, "brief", params)
+    position = _enqueue(job)
+    _push_progress(job_id, f"Queued (position {position})")
 
     return ResearchResponse(job_id=job_id)
 
 
+@app.post("/api/content-brief/batch", response_model=BatchResponse)
+async def start_content_brief_batch(
+    request: ContentBriefBatchRequest, background_tasks: BackgroundTasks
+):
+    items = [(item.keyword.strip(), item.competitor_urls) for item in request.items]
+    items += [(keyword.strip(), []) for keyword in request.keywords]
+    items = [(keyword, urls) for keyword, urls in items if keyword]
+    if not items:
+        raise HTTPException(status_code=422, detail="batch has no keywords")
+    if len(items) > BATCH_MAX_KEYWORDS:
+        raise HTTPException(
+            status_code=422, detail=f"batch is limited to {BATCH_MAX_KEYWORDS} keywords"
+        )
+
+    from brief_worker import normalize_keyword
+
+    # Repeated keywords (same competitor URLs) share one brief job.
+    batch_id = "batch-" + str(uuid.uuid4())
+    job_ids: dict[tuple, str] = {}
+    manifest = []
+    for keyword, urls in items:
+        key = (normalize_keyword(keyword), tuple(urls))
+        job_id = job_ids.setdefault(key, "brief-" + str(uuid.uuid4()))
+        manifest.append({"keyword": keyword, "job_id": job_id})
+
+    job_store.create(batch_id, "batch", {"items": manifest})
+    job_store.update(batch_id, status="running")
+    jobs = {}
+    for (keyword, urls), item in zip(items, manifest):
+        if item["job_id"] in jobs:
+            continue
+        jobs[item["job_id"]] = job_store.create(
+            item["job_id"], "brief",
+            {
+                "keyword": keyword,
+                "competitor_urls": urls,
+                "force_refresh": request.force_refresh,
+                "batch_id": batch_id,
+            },
+        )
+    searched = [keyword for keyword, urls in items if not urls]
+    background_tasks.add_task(_start_batch, batch_id, list(jobs.values()), searched, len(items))
+
+    return BatchResponse(batch_id=batch_id, job_ids=[item["job_id"] for item in manifest])
+
+
+def _start_batch(
+    batch_id: str, jobs: list[dict[str, Any]], searched: list[str], keywords: int
+) -> None:
+    """Warms the SERP cache with batched Serper calls, then enqueues the briefs.
+
+    Runs after the response is sent, so a slow Serper doesn't hold up the
+    request; the briefs wait as "queued" meanwhile (and are re-queued by
+    _recover_jobs if the server stops first).
+    """
+    from brief_worker import prefetch_serp
+
+    serper_key = os.getenv("SERPER_API_KEY", "")
+    try:
+        if serper_key and searched:
+            _push_progress(batch_id, f"Prefetching search results for {len(searched)} keywords...")
+            prefetch_serp(serper_key, searched)
+    finally:
+        for job in jobs:
+            position = _enqueue(job)
+            _push_progress(job["job_id"], f"Queued (position {position})")
+        _push_progress(batch_id, f"Queued {len(jobs)} briefs for {keywords} keywords")
+
+
+@app.get("/api/content-brief/batch/{batch_id}", response_model=BatchStatus)
+async def get_content_brief_batch(batch_id: str):
+    batch = job_store.get(batch_id)
+    if batch is None or batch["kind"] != "batch":
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    jobs = []
+    for item in batch["params"]["items"]:
+        job = job_store.get(item["job_id"])
+        jobs.append(BatchJob(
+            keyword=item["keyword"],
+            job_id=item["job_id"],
+            status=job["status"] if job else "error",
+            report_url=_report_fields(job)["report_url"] if job else None,
+        ))
+    return BatchStatus(
+        batch_id=batch_id,
+        status=batch["status"],
+        total=len(jobs),
+        counts=_batch_counts(batch),
+        progress=batch["progress"],
+        jobs=jobs,
+    )
+
+
 @app.get("/api/content-brief/{job_id}/stream")
-async def stream_content_brief(job_id: str):
+async def stream_content_brief(job_id: str, last_event_id: str | None = Header(default=None)):
     if job_id not in job_store:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    async def event_generator():
-        last_idx = 0
-        heartbeat_counter = 0
-
-        while True:
-            job = job_store.get(job_id)
-            if job is None:
-                yield {"event": "error", "data": "Job not found"}
-                return
-
-            progress = job.get("progress", [])
-            while last_idx < len(progress):
-                yield {"event": "progress", "data": progress[last_idx]}
-                last_idx += 1
-
-            status = job.get("status")
-
-            if status == "complete":
-                import json as _json
-                payload = _json.dumps({"report_html": job.get("report_html", "")})
-                yield {"event": "complete", "data": payload}
-                return
-            elif status == "error":
-                yield {"event": "error", "data": job.get("error", "Unknown error")}
-                return
-
-            heartbeat_counter += 1
-            if heartbeat_counter >= 15:
-                yield {"event": "heartbeat", "data": "ping"}
-                heartbeat_counter = 0
-
-            await asyncio.sleep(1)
-
-    return EventSourceResponse(event_generator())
+    return EventSourceResponse(_job_event_stream(job_id, _parse_last_event_id(last_event_id)))
 
 
 @app.get("/api/content-brief/{job_id}", response_model=JobStatus)
 async def get_content_brief_status(job_id: str):
     if job_id not in job_store:
         raise HTTPException(status_code=404, detail="Job not found")
-    job = job_store[job_id]
+    job = job_store.get(job_id)
     return JobStatus(
         job_id=job_id,
         status=job["status"],
         progress=job["progress"],
-        report_html=job.get("report_html"),
+        **_report_fields(job),
         error=job.get("error"),
+        queue_position=executor.position(job_id),
+        timings=job["timings"],
+        usage=job["usage"],
     )
 
 
+@app.get("/api/content-brief/{job_id}/report")
+async def get_content_brief_report(job_id: str, request: Request):
+    return await _report_response(job_id, request)
+
+
 # ── Entry point ───────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
 
     host = os.getenv("BACKEND_HOST", "127.0.0.1")
     port = int(os.getenv("BACKEND_PORT", "8000"))
-    uvicorn.run("main:app", host=host, port=port, reload=False)
+    # Pass the app object: "main:app" would import this file a second time.
+    uvicorn.run(app, host=host, port=port, reload=False)
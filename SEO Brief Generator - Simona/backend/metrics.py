@@ -0,0 +1,175 @@
+"""
+In-process metrics in Prometheus text exposition format (served on /metrics).
+
+Counters, histograms and callback gauges with labels — just enough of the
+Prometheus data model for this service, without a client library.
+stage_timer() times one pipeline stage, records it on the job and feeds the
+stage duration histogram.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+
+def _fmt_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labels, lv)} {v}" for lv, v in items
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = _DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+        # label values -> [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            row = self._values.setdefault(label_values, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((lv, list(row)) for lv, row in self._values.items())
+        lines = self.header()
+        for lv, row in items:
+            for bound, count in zip(self.buckets, row):
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, lv, le)} {count}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, lv, inf)} {row[-1]}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, lv)} {row[-2]}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, lv)} {row[-1]}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time: fn() -> {label values: value}."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...],
+                 fn: Callable[[], dict[tuple[str, ...], float]]) -> None:
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            values = {}
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labels, lv)} {v}" for lv, v in sorted(values.items())
+        ]
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+_registry: dict[str, _Metric] = {}
+
+
+def register(metric: _Metric) -> _Metric:
+    """Adds a metric to /metrics; registering a name again replaces the earlier one."""
+    _registry[metric.name] = metric
+    return metric
+
+
+def render_latest() -> str:
+    lines: list[str] = []
+    for metric in _registry.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = register(Histogram(
+    "seo_job_stage_seconds", "Duration of pipeline stages", ("kind", "stage"),
+))
+JOBS_FINISHED = register(Counter(
+    "seo_jobs_finished_total", "Jobs that reached a terminal status", ("kind", "status"),
+))
+UPSTREAM_ERRORS = register(Counter(
+    "seo_upstream_errors_total", "Failed calls to upstream services", ("upstream", "error"),
+))
+
+BRIEFS_COALESCED = register(Counter(
+    "seo_briefs_coalesced_total", "Brief submissions attached to an identical in-flight job",
+))
+RATE_LIMIT_WAIT = register(Histogram(
+    "seo_rate_limit_wait_seconds", "Time spent waiting on upstream rate limiters", ("upstream",),
+))
+RATE_LIMITED = register(Counter(
+    "seo_rate_limited_total", "429/503 responses with Retry-After, per upstream", ("upstream",),
+))
+LLM_TOKENS = register(Counter(
+    "seo_llm_tokens_total", "Claude tokens by type, including prompt cache reads/writes", ("type",),
+))
+
+
+def upstream_error(upstream: str, exc: BaseException) -> None:
+    """Counts a failed upstream call, labelled by HTTP status or exception type."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    UPSTREAM_ERRORS.inc(upstream, f"http_{status}" if status else type(exc).__name__)
+
+
+@contextmanager
+def stage_timer(job_store, job_id: str, kind: str, stage: str, name: str | None = None) -> Iterator[None]:
+    """Times a stage; stores it on the job as `name` (default: stage) and in the histogram."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(job_store, job_id, kind, stage, time.perf_counter() - t0, name)
+
+
+def record_stage(job_store, job_id: str, kind: str, stage: str, seconds: float,
+                 name: str | None = None) -> None:
+    STAGE_SECONDS.observe(seconds, kind, stage)
+    job_store.record_timing(job_id, name or stage, seconds)
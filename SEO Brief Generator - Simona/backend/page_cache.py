@@ -0,0 +1,146 @@
+"""
+Disk-backed HTTP response cache for competitor pages.
+
+Entries are keyed by URL and stored as <sha256>.body + <sha256>.json (status
+headers, ETag, Last-Modified, encoding, timestamps). Fresh entries are served
+without a request; stale ones are revalidated with If-None-Match /
+If-Modified-Since. Total body size is bounded with least-recently-used
+eviction.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+
+class PageCache:
+    def __init__(self, directory: str, max_bytes: int, fresh_seconds: float) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        # key -> [size, last_access]; rebuilt from disk on start-up
+        self._index: dict[str, list[float]] = {}
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        """Returns the cached entry ({body, meta}) for `url`, or None."""
+        key = self._key(url)
+        try:
+            with open(self._path(key, "json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(key, "body"), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        self._touch(key)
+        return {"body": body, "meta": meta}
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        return time.time() - entry["meta"]["stored_at"] < self.fresh_seconds
+
+    @staticmethod
+    def conditional_headers(entry: dict[str, Any]) -> dict[str, str]:
+        meta = entry["meta"]
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def put(self, url: str, body: bytes, headers: dict[str, str], encoding: str | None) -> None:
+        if "no-store" in headers.get("cache-control", "").lower():
+            return
+        if len(body) > self.max_bytes:
+            return
+        key = self._key(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "encoding": encoding,
+            "stored_at": time.time(),
+        }
+        self._write(key, "body", body)
+        self._write(key, "json", json.dumps(meta).encode("utf-8"))
+        with self._lock:
+            old = self._index.get(key)
+            self._total += len(body) - (old[0] if old else 0)
+            self._index[key] = [len(body), time.time()]
+            self._evict()
+
+    def refresh(self, entry: dict[str, Any], url: str) -> None:
+        """Marks a revalidated (304) entry fresh again."""
+        meta = dict(entry["meta"], stored_at=time.time())
+        self._write(self._key(url), "json", json.dumps(meta).encode("utf-8"))
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _write(self, key: str, ext: str, data: bytes) -> None:
+        path = self._path(key, ext)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            if key in self._index:
+                self._index[key][1] = time.time()
+
+    def _scan(self) -> None:
+        for name in os.listdir(self.directory):
+            if not name.endswith(".body"):
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            self._index[name[:-5]] = [st.st_size, st.st_mtime]
+            self._total += st.st_size
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drops least-recently-used entries until under max_bytes. Holds _lock."""
+        if self._total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if self._total <= self.max_bytes:
+                break
+            for ext in ("body", "json"):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            del self._index[key]
+            self._total -= size
+
+
+def build_page_cache() -> PageCache | None:
+    """Creates the cache from PAGE_CACHE_* settings; None when disabled."""
+    max_mb = float(os.getenv("PAGE_CACHE_MAX_MB", "256"))
+    if max_mb <= 0:
+        return None
+    directory = os.getenv(
+        "PAGE_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache", "pages")
+    )
+    return PageCache(
+        directory,
+        max_bytes=int(max_mb * 1024 * 1024),
+        fresh_seconds=float(os.getenv("PAGE_CACHE_TTL", "3600")),
+    )
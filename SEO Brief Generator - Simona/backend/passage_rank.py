@@ -0,0 +1,98 @@
+"""
+Keyword-relevance ranking of competitor page passages with BM25 (NumPy).
+
+Page text is split into passages of a few sentences each, and every passage
+is scored against the brief keyword. Only query terms matter to BM25, so
+the term-frequency matrix is just passages × query terms and the scoring
+is a handful of array operations over it. Document
+frequencies come from all pages of the brief together, so a term every
+competitor repeats counts for less than one only some of them cover.
+"""
+import re
+
+import numpy as np
+
+PASSAGE_WORDS = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _query_terms(query: str) -> dict[str, int]:
+    """Maps each query term, singular and plural, to its column."""
+    terms: dict[str, int] = {}
+    columns = 0
+    for token in tokenize(query):
+        # Cheap plural folding so "slots" matches "slot"; no stemmer dependency.
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        if token not in terms:
+            terms.setdefault(token + "s", columns)
+            terms[token] = columns
+            columns += 1
+    return terms
+
+
+def split_passages(text: str, words: int = PASSAGE_WORDS) -> list[str]:
+    """Groups sentences into passages of about `words` words.
+
+    Runs without sentence punctuation (menus, link lists) are cut every
+    2 × `words` words so they can't swallow a page.
+    """
+    passages: list[str] = []
+    current: list[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence_words = sentence.split()
+        while len(sentence_words) > 2 * words:
+            if current:
+                passages.append(" ".join(current))
+                current = []
+            passages.append(" ".join(sentence_words[:2 * words]))
+            sentence_words = sentence_words[2 * words:]
+        current.extend(sentence_words)
+        if len(current) >= words:
+            passages.append(" ".join(current))
+            current = []
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def bm25_scores(passages: list[str], query: str) -> np.ndarray:
+    """BM25 score of each passage for `query` (zeros when nothing matches)."""
+    term_ids = _query_terms(query)
+    if not passages or not term_ids:
+        return np.zeros(len(passages))
+
+    # Only query-term occurrences are needed, so one regex over each passage
+    # finds them without tokenizing everything else.
+    pattern = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, sorted(term_ids, key=len, reverse=True))) + r")\b",
+        re.IGNORECASE,
+    )
+    doc_index, term_index = [], []
+    for i, passage in enumerate(passages):
+        for match in pattern.findall(passage):
+            # IGNORECASE also matches e.g. "İ" and "ſ", whose lower() differs
+            # from the query term; tokenize() wouldn't count those either.
+            column = term_ids.get(match.lower())
+            if column is not None:
+                doc_index.append(i)
+                term_index.append(column)
+    tf = np.zeros((len(passages), max(term_ids.values()) + 1))
+    np.add.at(tf, (np.array(doc_index, dtype=np.int64), np.array(term_index, dtype=np.int64)), 1.0)
+    # Passages are space-joined words (split_passages), so spaces count words.
+    lengths = np.fromiter((p.count(" ") + 1 for p in passages), dtype=np.float64, count=len(passages))
+
+    n = len(passages)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0)
+    avgdl = lengths.mean() or 1.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+    return (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ idf
@@ -0,0 +1,156 @@
+"""
+Staged pipeline executor — each stage has its own worker threads and hands
+items to the next stage through a bounded queue.
+
+Where JobPool runs a whole job on one thread, a Pipeline lets different
+items occupy different stages at once: one brief's pages are fetched while
+another is with Claude. A full downstream queue blocks the stage feeding it
+(backpressure), so throughput settles at the slowest stage's rate without
+piling up half-finished work. Admission into the first stage is unbounded
+and FIFO, like JobPool, and exposes the same submit/position/stats/shutdown
+surface so it can sit in a JobExecutor.
+"""
+import queue
+import threading
+from typing import Any, Callable
+
+_POLL_SECONDS = 0.5
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[[Any], None], workers: int) -> None:
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.active = 0
+
+
+class Pipeline:
+    """Runs items through `stages` in order; fn(item) mutates the item in place.
+
+    on_done(item) is called after the last stage; on_error(item, exc) when a
+    stage raises, after which the item leaves the pipeline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stages: list[Stage],
+        queue_size: int = 8,
+        on_done: Callable[[Any], None] | None = None,
+        on_error: Callable[[Any, Exception], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.stages = stages
+        self.on_done = on_done
+        self.on_error = on_error
+        # inboxes[0] is the admission queue; the rest sit between stages.
+        self._inboxes: list[queue.Queue] = [queue.Queue()] + [
+            queue.Queue(maxsize=max(1, queue_size)) for _ in stages[1:]
+        ]
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        # Same ticket scheme as JobPool: the admission queue is FIFO.
+        self._tickets: dict[str, int] = {}
+        self._admitted = 0
+        self._dequeued = 0
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        for index, stage in enumerate(self.stages):
+            for i in range(stage.workers):
+                t = threading.Thread(
+                    target=self._worker, args=(index,),
+                    name=f"{self.name}-{stage.name}-{i}", daemon=True,
+                )
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, job_id: str, item: Any) -> int:
+        """Queues an item for the first stage; returns its 1-based position."""
+        with self._lock:
+            if self._stopping.is_set():
+                raise RuntimeError(f"{self.name} pipeline is shutting down")
+            self._ensure_started()
+            self._admitted += 1
+            self._tickets[job_id] = self._admitted
+            position = self._admitted - self._dequeued
+        self._inboxes[0].put((job_id, item))
+        return position
+
+    def position(self, job_id: str) -> int | None:
+        with self._lock:
+            ticket = self._tickets.get(job_id)
+            return None if ticket is None else ticket - self._dequeued
+
+    def stats(self) -> dict[str, Any]:
+        """Totals in JobPool.stats() form, plus a per-stage breakdown."""
+        with self._lock:
+            stages = {
+                stage.name: {
+                    "workers": stage.workers,
+                    "queued": inbox.qsize(),
+                    "active": stage.active,
+                }
+                for stage, inbox in zip(self.stages, self._inboxes)
+            }
+        admission, *between = stages.values()
+        return {
+            "workers": sum(s["workers"] for s in stages.values()),
+            "queued": admission["queued"],
+            # Admitted and not finished: running in a stage or waiting between stages.
+            "active": sum(s["active"] for s in stages.values()) + sum(s["queued"] for s in between),
+            "stages": stages,
+        }
+
+    def shutdown(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _worker(self, index: int) -> None:
+        stage, inbox = self.stages[index], self._inboxes[index]
+        last = index == len(self.stages) - 1
+        while not self._stopping.is_set():
+            try:
+                job_id, item = inbox.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            with self._lock:
+                if index == 0:
+                    self._dequeued += 1
+                    self._tickets.pop(job_id, None)
+                stage.active += 1
+            try:
+                stage.fn(item)
+            except Exception as exc:
+                self._finish(self.on_error, item, exc)
+                continue
+            finally:
+                with self._lock:
+                    stage.active -= 1
+            if last:
+                self._finish(self.on_done, item)
+            else:
+                self._hand_off(index + 1, (job_id, item))
+
+    def _hand_off(self, index: int, entry: tuple[str, Any]) -> None:
+        # Blocks while the next stage is full — that is the backpressure.
+        while not self._stopping.is_set():
+            try:
+                self._inboxes[index].put(entry, timeout=_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _finish(self, callback: Callable[..., None] | None, *args: Any) -> None:
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception:
+            # Callbacks record their own errors; never let one kill the worker.
+            import traceback
+            print(f"[{self.name} pipeline] {traceback.format_exc()}", flush=True)
@@ -0,0 +1,242 @@
+"""
+Per-upstream rate limiting — a token bucket plus a concurrency cap for each
+upstream (Serper, Anthropic, crew runs) and for each competitor domain.
+
+Limits come from the environment: RATE_<NAME>_RPS (tokens per second, 0 =
+unlimited), RATE_<NAME>_BURST (bucket size) and RATE_<NAME>_CONCURRENCY
+(calls in flight, 0 = unlimited). Every competitor domain gets its own
+limiter from the RATE_DOMAIN_* settings. A 429/503 carrying Retry-After
+pauses the limiter for that long, so the next callers wait it out instead
+of hammering the upstream. Time spent waiting is returned by slot() and
+observed in seo_rate_limit_wait_seconds.
+
+slot(block=False) raises Throttled instead of sleeping, so callers on a
+shared pool (page fetches) can hand the work back and retry later rather
+than tie up a thread. Domain limiters idle for DOMAIN_IDLE_SECONDS are
+dropped from the registry.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from metrics import RATE_LIMIT_WAIT, RATE_LIMITED
+
+# Longest Retry-After honoured; anything beyond is treated as this long.
+MAX_RETRY_AFTER = float(os.getenv("RATE_MAX_RETRY_AFTER", "120"))
+
+# Retry hint when a non-blocking caller finds every concurrency slot taken.
+SLOT_RETRY_SECONDS = 0.25
+DOMAIN_IDLE_SECONDS = 300.0
+
+# (rps, burst, concurrency) per limiter when RATE_<NAME>_* are unset.
+_DEFAULTS = {
+    "serper": (5.0, 10, 8),
+    "anthropic": (0.8, 5, 8),  # ~50 requests/minute, the lowest API tier
+    "crew": (0.0, 1, 1),  # below RESEARCH_WORKERS=2, so it holds runs back
+    "domain": (1.0, 3, 2),
+}
+
+
+class Throttled(Exception):
+    """Raised by a non-blocking slot() that would have to wait `retry_in` seconds."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"rate limited for {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Reservation-style bucket: each call takes a token now and is told how long to wait."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_take(self) -> float:
+        """Takes a token if one is available (returns 0), else returns seconds until one is."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class Limiter:
+    def __init__(self, name: str, rps: float, burst: int, concurrency: int, label: str) -> None:
+        self.name = name
+        self.label = label  # metrics label; all domains share "page"
+        self._bucket = TokenBucket(rps, burst) if rps > 0 else None
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self.last_used = time.monotonic()
+
+    @contextmanager
+    def slot(self, block: bool = True) -> Iterator[float]:
+        """Holds a concurrency slot and a token for the block; yields seconds waited.
+
+        With block=False nothing is taken and Throttled is raised when either
+        would need waiting for; the wait is then the caller's to measure.
+        """
+        t0 = time.monotonic()
+        if block:
+            self._acquire()
+            waited = time.monotonic() - t0
+            RATE_LIMIT_WAIT.observe(waited, self.label)
+        else:
+            self._try_acquire()
+            waited = 0.0
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield waited
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.last_used = time.monotonic()
+            if self._slots:
+                self._slots.release()
+
+    def _acquire(self) -> None:
+        with self._lock:
+            self._waiting += 1
+        try:
+            if self._slots:
+                self._slots.acquire()
+            delay = max(0.0, self._paused_until - time.monotonic())
+            if self._bucket:
+                delay = max(delay, self._bucket.reserve())
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _try_acquire(self) -> None:
+        if self._slots and not self._slots.acquire(blocking=False):
+            raise Throttled(SLOT_RETRY_SECONDS)
+        delay = max(0.0, self._paused_until - time.monotonic())
+        if not delay and self._bucket:
+            delay = self._bucket.try_take()
+        if delay:
+            if self._slots:
+                self._slots.release()
+            raise Throttled(delay)
+
+    def idle(self, now: float) -> bool:
+        with self._lock:
+            return (
+                not self._waiting and not self._in_flight
+                and now >= self._paused_until and now - self.last_used >= DOMAIN_IDLE_SECONDS
+            )
+
+    def backoff(self, exc: BaseException) -> float | None:
+        """Pauses the limiter for the Retry-After of a 429/503 error; returns the pause."""
+        seconds = retry_after(exc)
+        if seconds is not None:
+            RATE_LIMITED.inc(self.label)
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        return seconds
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "waiting": self._waiting,
+                "in_flight": self._in_flight,
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            }
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from the Retry-After header of a 429/503 error response, if any."""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) not in (429, 503):
+        return None
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+_limiters: dict[str, Limiter] = {}
+_registry_lock = threading.Lock()
+_next_eviction = 0.0
+
+
+def _build(name: str, settings: str, label: str) -> Limiter:
+    rps, burst, concurrency = _DEFAULTS[settings]
+    prefix = f"RATE_{settings.upper()}_"
+    return Limiter(
+        name,
+        rps=float(os.getenv(prefix + "RPS", str(rps))),
+        burst=int(os.getenv(prefix + "BURST", str(burst))),
+        concurrency=int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),
+        label=label,
+    )
+
+
+def limiter(upstream: str) -> Limiter:
+    """The shared limiter for "serper", "anthropic" or "crew"."""
+    with _registry_lock:
+        if upstream not in _limiters:
+            _limiters[upstream] = _build(upstream, upstream, upstream)
+        return _limiters[upstream]
+
+
+def domain_limiter(url: str) -> Limiter:
+    """The shared limiter for the host serving `url`."""
+    global _next_eviction
+    host = (urlsplit(url).hostname or "").lower()
+    name = f"domain:{host}"
+    with _registry_lock:
+        if name not in _limiters:
+            now = time.monotonic()
+            if now >= _next_eviction:
+                _next_eviction = now + DOMAIN_IDLE_SECONDS / 5
+                for idle in [
+                    n for n, lim in _limiters.items() if n.startswith("domain:") and lim.idle(now)
+                ]:
+                    del _limiters[idle]
+            _limiters[name] = _build(name, "domain", "page")
+        domain = _limiters[name]
+        domain.last_used = time.monotonic()
+        return domain
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Queue/in-flight/pause state of the upstream limiters (domains omitted)."""
+    with _registry_lock:
+        upstreams = {n: l for n, l in _limiters.items() if not n.startswith("domain:")}
+    return {name: lim.stats() for name, lim in upstreams.items()}
@@ -9,15 +9,54 @@ class ResearchRequest(BaseModel):
 class ContentBriefRequest(BaseModel):
     keyword: str
     competitor_urls: list[str] = []
+    force_refresh: bool = False  # fresh run: no coalescing, no cached Claude response
+
+
+class BatchItem(BaseModel):
+    keyword: str
+    competitor_urls: list[str] = []
+
+
+class ContentBriefBatchRequest(BaseModel):
+    items: list[BatchItem] = []  # keywords with their own competitor URLs
+    keywords: list[str] = []  # shorthand for items without competitor URLs
+    force_refresh: bool = False
 
 
 class ResearchResponse(BaseModel):
     job_id: str
+    coalesced: bool = False  # True when attached to an identical brief already in flight
 
 
 class JobStatus(BaseModel):
     job_id: str
     status: str  # "queued" | "running" | "complete" | "error"
     progress: list[str] = []
-    report_html: Optional[str] = None
+    report_url: Optional[str] = None  # GET for the HTML report once status is "complete"
+    report_size: Optional[int] = None  # bytes, uncompressed
+    report_sha256: Optional[str] = None
     error: Optional[str] = None
+    queue_position: Optional[int] = None  # 1-based; None once the job has started
+    timings: dict[str, float] = {}  # stage -> seconds, e.g. "search", "fetch[1]", "llm"
+    usage: dict[str, int] = {}  # LLM tokens, incl. cache_creation/cache_read_input_tokens
+
+
+class BatchResponse(BaseModel):
+    batch_id: str
+    job_ids: list[str]  # one per submitted keyword, in order; repeated keywords share a job
+
+
+class BatchJob(BaseModel):
+    keyword: str
+    job_id: str
+    status: str
+    report_url: Optional[str] = None
+
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    status: str  # "running" | "complete"
+    total: int
+    counts: dict[str, int] = {}  # jobs per status
+    progress: list[str] = []
+    jobs: list[BatchJob] = []
@@ -0,0 +1,79 @@
+"""
+extract_page() against the BeautifulSoup extraction it replaced, on
+hand-written pages and seeded random documents.
+"""
+import random
+
+import pytest
+
+from html_extract import extract_page
+
+bs4 = pytest.importorskip("bs4")
+
+
+def reference(raw_html: str) -> tuple[str | None, str]:
+    """The removed BeautifulSoup code, with the fallback title left as None."""
+    soup = bs4.BeautifulSoup(raw_html, "lxml")
+    for tag in soup(["script", "style", "nav", "footer", "header"]):
+        tag.decompose()
+    content_el = (
+        soup.find("article")
+        or soup.find(class_="post-content")
+        or soup.find(class_="entry-content")
+        or soup.find("main")
+        or soup.find("body")
+    )
+    content_text = content_el.get_text(separator=" ", strip=True)[:800] if content_el else ""
+    h1 = soup.find("h1") or soup.find(class_="title") or soup.find(class_="post-title")
+    return (h1.get_text(strip=True)[:120] if h1 else None), content_text
+
+
+HAND_WRITTEN = [
+    "",
+    "plain text, no tags",
+    "<html><head><title>Doc</title></head><body><p>Hello</p> world</body></html>",
+    "<body><nav>Menu</nav><article><h1>Title</h1><p>Body text</p></article><footer>f</footer></body>",
+    "<body><div class='post-content'>Post</div><main>Main</main></body>",
+    "<body><main>Main <div class='entry-content'>Entry</div></main></body>",
+    "<body><div class='x title y'>Classy</div><h1>Heading</h1></body>",
+    "<body><span class='post-title'>PT</span><p>text<script>var x;</script>after</p></body>",
+    "<body><header><h1>Site</h1></header><p>Only body</p></body>",
+    "<body><p>a</p><template><p>hidden</p><article>in template</article></template>tail</body>",
+    "<body><template><h1>tt</h1></template><div class='title'>real</div>z</body>",
+    "<body><h1>T<template>x</template>y</h1><!-- comment -->text</body>",
+    "<body><template class='post-content'>a<p>b</p><template>c</template></template>z</body>",
+    "<body><p>café &amp; CASİNO &lt;b&gt;</p><style>p{}</style></body>",
+    "<body><article></article><main>fallback?</main></body>",
+    "<body><p>" + "long " * 400 + "</p><h1>" + "t" * 200 + "</h1></body>",
+]
+
+_TAGS = ["div", "p", "span", "section", "article", "main", "h1", "h2", "a", "ul", "li",
+         "script", "style", "nav", "footer", "header", "template", "b"]
+_CLASSES = ["", "post-content", "entry-content", "title", "post-title", "title extra", "other"]
+_WORDS = ["slots", "bonus", "café", "  spaced  ", "\n", "&amp;", "x", "Megaways", ""]
+
+
+def _random_html(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        roll = rng.random()
+        if roll < 0.4 or depth > 4:
+            parts.append(rng.choice(_WORDS))
+        elif roll < 0.45:
+            parts.append("<!-- note -->")
+        else:
+            tag = rng.choice(_TAGS)
+            cls = rng.choice(_CLASSES)
+            attr = f' class="{cls}"' if cls else ""
+            parts.append(f"<{tag}{attr}>{_random_html(rng, depth + 1)}</{tag}>")
+    return "".join(parts)
+
+
+RANDOM = [
+    f"<html><body>{_random_html(random.Random(seed))}</body></html>" for seed in range(300)
+]
+
+
+@pytest.mark.parametrize("raw_html", HAND_WRITTEN + RANDOM)
+def test_matches_beautifulsoup(raw_html):
+    assert extract_page(raw_html) == reference(raw_html)
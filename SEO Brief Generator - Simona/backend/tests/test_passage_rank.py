@@ -0,0 +1,21 @@
+from context_pack import pack_contents
+from passage_rank import bm25_scores, split_passages
+
+
+def test_scores_favour_passages_with_query_terms():
+    passages = ["Megaways slots explained for beginners.", "Cookie settings and privacy."]
+    scores = bm25_scores(passages, "megaways slots")
+    assert scores[0] > scores[1] == 0
+
+
+def test_case_folding_that_changes_the_term_is_ignored():
+    # "İ".lower() and "ſ".lower() don't give the query's ASCII letters back.
+    scores = bm25_scores(split_passages("Best CASİNO bonus here."), "casino bonus")
+    assert scores.shape == (1,) and scores[0] > 0
+    assert bm25_scores(["ſlots only"], "slots")[0] == 0
+
+
+def test_pack_contents_handles_non_ascii_pages():
+    text = "Türkçe CASİNO rehberi. " * 200 + "Casino bonus details. " * 50
+    (packed,) = pack_contents([text], 200, query="casino bonus")
+    assert "Casino bonus details" in packed
@@ -0,0 +1,147 @@
+"""
+Two-tier TTL cache for JSON-serialisable values.
+
+A bounded in-memory LRU sits in front of an optional directory of JSON files,
+so entries survive restarts and are shared by workers. Hit/miss counters per
+tier are exposed through stats().
+
+The directory is swept on write, at most once per SWEEP_INTERVAL seconds:
+expired files are deleted, then the oldest until max_disk_entries remain.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+SWEEP_INTERVAL = 60.0
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable sha256 key for any JSON-serialisable parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 1024,
+        directory: str | None = None,
+        max_disk_entries: int | None = None,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries or 8 * max_entries
+        self._lock = threading.Lock()
+        self._mem: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_evictions": 0}
+        self._next_sweep = 0.0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None and now - item[0] < self.ttl:
+                self._mem.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return item[1]
+            if item is not None:
+                del self._mem[key]
+
+        item = self._read_disk(key)
+        with self._lock:
+            if item is not None and now - item[0] < self.ttl:
+                self._remember(key, item)
+                self._counters["disk_hits"] += 1
+                return item[1]
+            self._counters["misses"] += 1
+        if item is not None:
+            self.delete(key)  # expired on disk
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        item = (time.time(), value)
+        with self._lock:
+            self._remember(key, item)
+        if self.directory:
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": item[0], "value": value}, f)
+            os.replace(tmp, path)
+            self._maybe_sweep(item[0])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._mem.pop(key, None)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counters, entries=len(self._mem))
+
+    def _remember(self, key: str, item: tuple[float, Any]) -> None:
+        self._mem[key] = item
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _maybe_sweep(self, now: float) -> None:
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + SWEEP_INTERVAL
+        self.sweep()
+
+    def sweep(self) -> int:
+        """Deletes expired files, then the oldest beyond max_disk_entries; returns how many."""
+        if not self.directory:
+            return 0
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue  # removed by another worker
+        files.sort()
+        expired = sum(1 for mtime, _ in files if now - mtime >= self.ttl)
+        excess = max(0, len(files) - expired - self.max_disk_entries)
+        removed = 0
+        for _, path in files[:expired + excess]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._counters["disk_evictions"] += removed
+        return removed
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str) -> tuple[float, Any] | None:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                data = json.load(f)
+            return data["stored_at"], data["value"]
+        except (OSError, ValueError, KeyError):
+            return None
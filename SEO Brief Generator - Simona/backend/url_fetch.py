@@ -0,0 +1,94 @@
+"""
+Process-wide coordination of competitor page loads.
+
+SingleFlight runs a function once per key among concurrent callers: the
+first caller does the work, the rest wait on its future and get the same
+result or exception. UrlFetchCoordinator puts one in front of every page
+load, so concurrent briefs that share a ranking page download and extract
+it once, and remembers recent failures for a short TTL so a dead or slow
+site costs one timeout rather than one per brief.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from ttl_cache import TTLCache
+
+
+class SingleFlight:
+    """One call per key among concurrent callers.
+
+    With keep=True results (and errors) stay after the call finishes, so
+    later callers reuse them too — used as a per-batch memo. Errors of a
+    `transient` type are never kept.
+    """
+
+    def __init__(
+        self, keep: bool = False, transient: tuple[type[BaseException], ...] = ()
+    ) -> None:
+        self.keep = keep
+        self.transient = transient
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[..., Any], *args: Any) -> tuple[Any, bool]:
+        """Returns (fn(*args), whether the result came from another caller)."""
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+        if not owner:
+            return future.result(), True
+        forget = not self.keep
+        try:
+            result = fn(*args)
+        except BaseException as exc:
+            forget = forget or isinstance(exc, self.transient)
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if forget:
+                with self._lock:
+                    self._futures.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._futures)
+
+
+class RecentFailure(Exception):
+    """Raised instead of retrying a URL that failed moments ago."""
+
+
+class UrlFetchCoordinator:
+    def __init__(
+        self,
+        failure_ttl: float,
+        max_failures: int = 4096,
+        transient: tuple[type[BaseException], ...] = (),
+    ) -> None:
+        self._flights = SingleFlight()
+        self._failures = TTLCache("page_failures", ttl=failure_ttl, max_entries=max_failures)
+        self.failure_ttl = failure_ttl
+        self.transient = transient  # not remembered as failures
+
+    def load(self, url: str, fn: Callable[..., Any], *args: Any) -> tuple[Any, bool]:
+        """fn(*args) for `url`, shared with concurrent callers; fails fast on recent failures."""
+        error = self._failures.get(url) if self.failure_ttl > 0 else None
+        if error is not None:
+            raise RecentFailure(f"{error} (failed within the last {self.failure_ttl:.0f}s)")
+        return self._flights.do(url, self._load, url, fn, *args)
+
+    def _load(self, url: str, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return fn(*args)
+        except Exception as exc:
+            if self.failure_ttl > 0 and not isinstance(exc, self.transient):
+                self._failures.set(url, str(exc) or type(exc).__name__)
+            raise
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._failures.stats(), in_flight=len(self._flights))